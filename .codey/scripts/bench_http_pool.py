@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# =============================================================================
+# bench_http_pool.py
+# Benchmark: fresh connection per request vs. pooled keep-alive session.
+# Replays the request pattern of one update_codey.py run per user
+# (events, repos, starred, languages) against a local stub server.
+#
+# Usage:
+#   python .codey/scripts/bench_http_pool.py [users] [latency_ms]
+#   defaults: 5 users, 2 ms server latency
+#
+# No token, no GitHub — everything stays on 127.0.0.1.
+# =============================================================================
+# Licensed under Apache 2.0 & ESOL v1.1
+# https://github.com/ESOL-License/ESOL/
+# =============================================================================
+
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from codey_http import build_session
+
+# Request pattern of a single user run (see get_all_data_for_user)
+EVENT_PAGES   = 10
+REPO_PAGES    = 3
+STARRED_PAGES = 3
+LANG_CALLS    = 5
+
+
+# ─────────────────────────────────────────────
+# STUB SERVER
+# ─────────────────────────────────────────────
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version        = "HTTP/1.1"   # keep-alive, otherwise pooling can't show anything
+    disable_nagle_algorithm = True         # headers + body are separate writes
+    latency                 = 0.002
+
+    def do_GET(self):
+        time.sleep(self.latency)
+        body = b"{}" if "/languages" in self.path else json.dumps([{"id": 1}]).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_server(latency: float):
+    StubHandler.latency = latency
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+# ─────────────────────────────────────────────
+# ONE USER RUN
+# ─────────────────────────────────────────────
+
+def user_urls(base: str, user: str) -> list:
+    urls  = [f"{base}/users/{user}/events/public?page={p}" for p in range(1, EVENT_PAGES + 1)]
+    urls += [f"{base}/users/{user}/repos?page={p}" for p in range(1, REPO_PAGES + 1)]
+    urls += [f"{base}/users/{user}/starred?page={p}" for p in range(1, STARRED_PAGES + 1)]
+    urls += [f"{base}/repos/{user}/repo{i}/languages" for i in range(LANG_CALLS)]
+    return urls
+
+
+def run(get, base: str, users: int) -> list:
+    timings = []
+    for i in range(users):
+        start = time.perf_counter()
+        for url in user_urls(base, f"user{i}"):
+            get(url, timeout=20).json()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+# ─────────────────────────────────────────────
+# MAIN
+# ─────────────────────────────────────────────
+
+if __name__ == "__main__":
+    users   = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    latency = (float(sys.argv[2]) if len(sys.argv) > 2 else 2.0) / 1000
+
+    server, base = start_server(latency)
+    per_user     = len(user_urls(base, "x"))
+    print(f"Stub server at {base} — {users} users × {per_user} requests, {latency * 1000:.0f} ms latency")
+
+    fresh   = run(requests.get, base, users)
+    session = build_session()
+    pooled  = run(session.get, base, users)
+    session.close()
+    server.shutdown()
+
+    def avg_ms(t):
+        return sum(t) / len(t) * 1000
+
+    print("")
+    print("=" * 54)
+    print(f"  fresh connection / request:  {avg_ms(fresh):8.1f} ms per user")
+    print(f"  pooled keep-alive session:   {avg_ms(pooled):8.1f} ms per user")
+    print(f"  speedup:                     {avg_ms(fresh) / max(avg_ms(pooled), 1e-9):8.2f}x")
+    print("=" * 54)
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# =============================================================================
+# codey_atomic.py
+# Crash-safe file writes + rotating backups of the last good versions.
+#
+# open(path, 'w') truncates first and writes second — an Actions timeout or
+# OOM kill in between leaves half a codey.json, and load_codey starts over
+# from defaults. Instead:
+#
+#   1. write <dir>/.<name>.<random>.tmp
+#   2. flush + fsync the temp file
+#   3. os.replace() onto the target (atomic on POSIX and Windows)
+#   4. fsync the directory, so the rename itself survives a power cut
+#
+# Readers see the old file or the new one, never a mix.
+#
+# With backup=True the file being replaced is copied first — if it is still
+# valid (JSON parses, SVG / Markdown not empty) — into a rotating set:
+#
+#   my_codey/backups/codey_json/codey_20260301T060012Z.json    (root files)
+#   my_codey/backups/codey_svg/codey_20260301T060012Z.svg
+#   <folder>/.backups/codey_json/...                           (batch users)
+#
+# The newest CODEY_BACKUP_KEEP versions are kept. read_latest_backup() is
+# used when a file turns out to be corrupt anyway.
+#
+# The backup copies are git-ignored. In Actions every workflow carries its
+# own set across runs with actions/cache (update-codey.yml, the two star
+# report workflows, audit_collector.yml) — a fresh checkout alone starts empty.
+#
+# Place in: .codey/scripts/codey_atomic.py
+# =============================================================================
+# Licensed under Apache 2.0 & ESOL v1.1
+# https://github.com/ESOL-License/ESOL/
+# =============================================================================
+
+import json
+import os
+import shutil
+import uuid
+from datetime import timezone
+from pathlib import Path
+
+from codey_clock import now as clock_now
+
+# ─────────────────────────────────────────────
+# CONFIG
+# ─────────────────────────────────────────────
+BACKUP_ROOT = Path(os.environ.get("CODEY_BACKUP_DIR", "my_codey/backups"))
+BACKUP_KEEP = int(os.environ.get("CODEY_BACKUP_KEEP", 5))
+
+
+# ─────────────────────────────────────────────
+# WRITE
+# ─────────────────────────────────────────────
+
+def atomic_write(path, data, backup: bool = False, durable: bool = True, encoding: str = "utf-8"):
+    """
+    Replaces path with data (str or bytes) in one step.
+    backup=True  → the previous good version goes into the backup set first.
+    durable=False → skip the fsyncs (caches: a lost write only costs a refetch).
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if backup:
+        backup_file(path)
+
+    raw = data.encode(encoding) if isinstance(data, str) else data
+    tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        with open(tmp, "wb") as f:
+            f.write(raw)
+            if durable:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    if durable:
+        _fsync_dir(path.parent)
+
+
+def atomic_write_json(path, obj, backup: bool = False, durable: bool = True, **dump_kwargs):
+    atomic_write(path, json.dumps(obj, **dump_kwargs), backup=backup, durable=durable)
+
+
+def _fsync_dir(folder: Path):
+    try:
+        fd = os.open(folder, os.O_RDONLY)
+    except OSError:
+        return                              # Windows: directories can't be opened
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+# ─────────────────────────────────────────────
+# BACKUPS
+# ─────────────────────────────────────────────
+
+def backup_dir(path) -> Path:
+    """my_codey/backups/<name>_<ext>/ for files in the repo root, else <folder>/.backups/<name>_<ext>/."""
+    path   = Path(path)
+    bucket = f"{path.stem}_{path.suffix.lstrip('.')}".lower()
+    if path.parent.resolve() == Path.cwd().resolve():
+        return BACKUP_ROOT / bucket
+    return path.parent / ".backups" / bucket
+
+
+def is_valid(path) -> bool:
+    """Good enough to keep: JSON parses, everything else is not empty."""
+    path = Path(path)
+    try:
+        text = path.read_text(encoding="utf-8")
+    except (FileNotFoundError, UnicodeDecodeError):
+        return False
+    if not text.strip():
+        return False
+    if path.suffix == ".json":
+        try:
+            json.loads(text)
+        except json.JSONDecodeError:
+            return False
+    return True
+
+
+def backup_file(path):
+    """Copies path into its backup set (if valid) and prunes the set to BACKUP_KEEP."""
+    path = Path(path)
+    if BACKUP_KEEP <= 0 or not is_valid(path):
+        return
+    folder = backup_dir(path)
+    folder.mkdir(parents=True, exist_ok=True)
+    stamp  = clock_now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    shutil.copy2(path, folder / f"{path.stem}_{stamp}{path.suffix}")
+
+    versions = sorted(folder.glob(f"{path.stem}_*{path.suffix}"))
+    for old in versions[:-BACKUP_KEEP]:
+        old.unlink(missing_ok=True)
+
+
+def read_latest_backup(path) -> tuple:
+    """(backup_path, text) of the newest valid backup of path, or (None, None)."""
+    path = Path(path)
+    for candidate in sorted(backup_dir(path).glob(f"{path.stem}_*{path.suffix}"), reverse=True):
+        if is_valid(candidate):
+            return candidate, candidate.read_text(encoding="utf-8")
+    return None, None
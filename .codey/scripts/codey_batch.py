@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# =============================================================================
+# codey_batch.py
+# Multi-user batch mode — one Codey per developer, many developers per run.
+#
+#   python update_codey.py --batch team.txt
+#
+# Manifest: one user per line ("owner" or "owner/repo", # comments allowed),
+# or a JSON list of logins / {"owner": ...} objects.
+#
+# Each user gets its own state + SVG under CODEY_BATCH_OUT:
+#   codey_batch/<owner>/codey.json
+#   codey_batch/<owner>/codey.svg
+#
+# Users run on a bounded thread pool (CODEY_BATCH_WORKERS). Threads, not
+# processes: all users share one session, one rate-limit budget, one HTTP
+# cache and the single-flight table — a process pool would split them.
+#
+# At the end: summary table (time, API calls, result per user), also written
+# to codey_batch/batch_summary.json. Who runs at all is decided by the fleet
+# scheduler (codey_fleet.py) — users over budget show up as "deferred".
+#
+# Place in: .codey/scripts/codey_batch.py
+# =============================================================================
+# Licensed under Apache 2.0 & ESOL v1.1
+# https://github.com/ESOL-License/ESOL/
+# =============================================================================
+
+import json
+import os
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timezone
+from pathlib import Path
+
+from codey_clock import now as clock_now
+from codey_atomic import atomic_write_json
+from codey_http import request_scope
+from codey_singleflight import singleflight
+
+# ─────────────────────────────────────────────
+# CONFIG
+# ─────────────────────────────────────────────
+BATCH_WORKERS = int(os.environ.get("CODEY_BATCH_WORKERS", 4))
+BATCH_OUT     = Path(os.environ.get("CODEY_BATCH_OUT", "codey_batch"))
+
+
+def load_manifest(path: str) -> list:
+    """Returns the unique owner logins of a manifest, in manifest order."""
+    text = Path(path).read_text(encoding="utf-8")
+    if path.endswith(".json"):
+        entries = [e["owner"] if isinstance(e, dict) else e for e in json.loads(text)]
+    else:
+        entries = [line.split("#")[0].strip() for line in text.splitlines()]
+
+    owners, seen = [], set()
+    for entry in entries:
+        owner = entry.strip().split("/")[0] if entry else ""
+        if owner and owner.lower() not in seen:
+            seen.add(owner.lower())
+            owners.append(owner)
+    return owners
+
+
+def user_paths(owner: str, out_dir: Path = None) -> tuple:
+    """(state_path, svg_path) of one user — folder is created."""
+    folder = (out_dir or BATCH_OUT) / owner.lower()
+    folder.mkdir(parents=True, exist_ok=True)
+    return str(folder / "codey.json"), str(folder / "codey.svg")
+
+
+# ─────────────────────────────────────────────
+# RUN
+# ─────────────────────────────────────────────
+
+def run_batch(owners: list, run_user, workers: int = None, out_dir: Path = None) -> list:
+    """
+    run_user(owner, state_path, svg_path) → result label (e.g. backend used).
+    Exceptions are caught per user — one broken account never stops the batch.
+    Returns one summary row per user, in input order.
+    """
+    workers = max(1, workers or BATCH_WORKERS)
+    out_dir = out_dir or BATCH_OUT
+
+    def one(owner):
+        state_path, svg_path = user_paths(owner, out_dir)
+        start = time.perf_counter()
+        with request_scope() as calls, singleflight.scope():   # results don't leak to the next user
+            try:
+                result, error = run_user(owner, state_path, svg_path), None
+            except Exception as e:
+                result, error = "failed", f"{type(e).__name__}: {e}"
+                traceback.print_exc()
+        return {
+            "owner":   owner,
+            "result":  result,
+            "error":   error,
+            "seconds": round(time.perf_counter() - start, 2),
+            "calls":   dict(calls),
+        }
+
+    print(f"👥 Batch: {len(owners)} users, {workers} workers → {out_dir}/")
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        rows = list(pool.map(one, owners))
+
+    write_summary(rows, out_dir)
+    return rows
+
+
+def write_summary(rows: list, out_dir: Path):
+    out_dir.mkdir(parents=True, exist_ok=True)
+    atomic_write_json(out_dir / "batch_summary.json", {
+        "finished_at": clock_now(timezone.utc).isoformat(),
+        "users":       rows,
+    }, indent=2)
+
+
+def print_summary(rows: list):
+    width = max([len(r["owner"]) for r in rows] + [5])
+    print("")
+    print(f"  {'owner':<{width}}  {'time':>7}  {'calls':>5}  result")
+    print(f"  {'-' * width}  {'-' * 7}  {'-' * 5}  {'-' * 20}")
+    for r in rows:
+        result = r["error"] or r["result"]
+        print(f"  {r['owner']:<{width}}  {r['seconds']:>6.1f}s  {sum(r['calls'].values()):>5}  {result}")
+    failed   = sum(1 for r in rows if r["error"])
+    deferred = sum(1 for r in rows if r["result"] == "deferred")
+    handover = sum(1 for r in rows if r["result"] in ("elsewhere", "not due"))   # other runner (leases)
+    print(f"👥 Batch done: {len(rows) - failed - deferred - handover} ok, {failed} failed, "
+          f"{deferred} deferred" + (f", {handover} done by other runners" if handover else "")
+          + f", {sum(r['seconds'] for r in rows):.1f}s user time")
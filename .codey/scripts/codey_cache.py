@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# =============================================================================
+# codey_cache.py
+# Conditional-request disk cache (ETag / Last-Modified) for GitHub REST calls.
+#
+# How it works:
+#   1. Before a GET we send If-None-Match / If-Modified-Since from the cache.
+#   2. GitHub answers 304 Not Modified → body comes from disk.
+#      304s do NOT count against the rate limit.
+#   3. A 200 with ETag/Last-Modified is stored for the next run.
+#
+# Layout:
+#   .codey/http_cache/index.json   key → etag, last_modified, link, size, last_used
+#   .codey/http_cache/<key>.json   raw response body
+#
+# Size-bounded: least recently used entries are evicted when the cache
+# grows over CODEY_CACHE_MAX_MB.
+#
+# Place in: .codey/scripts/codey_cache.py
+# =============================================================================
+# Licensed under Apache 2.0 & ESOL v1.1
+# https://github.com/ESOL-License/ESOL/
+# =============================================================================
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from codey_atomic import atomic_write, atomic_write_json
+
+# ─────────────────────────────────────────────
+# CONFIG
+# ─────────────────────────────────────────────
+CACHE_ENABLED = os.environ.get("CODEY_HTTP_CACHE", "true").lower() == "true"
+CACHE_DIR     = Path(os.environ.get("CODEY_CACHE_DIR", ".codey/http_cache"))
+CACHE_MAX_MB  = float(os.environ.get("CODEY_CACHE_MAX_MB", 50))
+
+
+def cache_key(url: str, params: dict = None) -> str:
+    """Stable key for url + query params (param order does not matter)."""
+    raw = url + "?" + "&".join(f"{k}={v}" for k, v in sorted((params or {}).items()))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+# ─────────────────────────────────────────────
+# CACHE
+# ─────────────────────────────────────────────
+
+class HttpCache:
+    """ETag/Last-Modified cache with LRU eviction. Thread-safe."""
+
+    def __init__(self, directory: Path = CACHE_DIR, max_bytes: int = None, enabled: bool = CACHE_ENABLED):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes if max_bytes is not None else int(CACHE_MAX_MB * 1024 * 1024)
+        self.enabled   = enabled
+        self.stats     = {"hits": 0, "misses": 0, "stored": 0, "evicted": 0}
+        self._lock     = threading.Lock()
+        self._index    = self._load_index() if enabled else {}
+
+    # ── index ───────────────────────────────
+    def _load_index(self) -> dict:
+        try:
+            return json.loads((self.directory / "index.json").read_text(encoding="utf-8"))
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def save(self):
+        """Writes the index back to disk. Call once at the end of a run."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            atomic_write_json(self.directory / "index.json", self._index, durable=False)
+
+    # ── request side ────────────────────────
+    def conditional_headers(self, url: str, params: dict = None) -> dict:
+        """Returns If-None-Match / If-Modified-Since for a cached entry, else {}."""
+        if not self.enabled:
+            return {}
+        with self._lock:
+            entry = self._index.get(cache_key(url, params))
+        if not entry:
+            return {}
+        h = {}
+        if entry.get("etag"):
+            h["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            h["If-Modified-Since"] = entry["last_modified"]
+        return h
+
+    # ── response side ───────────────────────
+    def load(self, url: str, params: dict = None):
+        """Body for a 304 answer. Returns None if the body file is gone."""
+        key = cache_key(url, params)
+        try:
+            body = json.loads((self.directory / f"{key}.json").read_text(encoding="utf-8"))
+        except (FileNotFoundError, json.JSONDecodeError):
+            with self._lock:
+                self._index.pop(key, None)
+            return None
+        with self._lock:
+            if key in self._index:
+                self._index[key]["last_used"] = time.time()
+            self.stats["hits"] += 1
+        return body
+
+    def link(self, url: str, params: dict = None) -> str:
+        """Stored Link header (pagination) — 304 answers don't always repeat it."""
+        with self._lock:
+            return (self._index.get(cache_key(url, params)) or {}).get("link") or ""
+
+    def store(self, url: str, params: dict, response_headers, body):
+        """Stores a 200 body if the response carries a validator."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self.stats["misses"] += 1
+        etag          = response_headers.get("ETag")
+        last_modified = response_headers.get("Last-Modified")
+        if not etag and not last_modified:
+            return
+
+        key = cache_key(url, params)
+        raw = json.dumps(body)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        atomic_write(self.directory / f"{key}.json", raw, durable=False)
+        with self._lock:
+            self._index[key] = {
+                "url":           url,
+                "etag":          etag,
+                "last_modified": last_modified,
+                "link":          response_headers.get("Link"),
+                "size":          len(raw),
+                "last_used":     time.time(),
+            }
+            self.stats["stored"] += 1
+            self._evict()
+
+    def _evict(self):
+        """Drops least recently used entries until we fit max_bytes. Lock must be held."""
+        total = sum(e.get("size", 0) for e in self._index.values())
+        if total <= self.max_bytes:
+            return
+        for key, entry in sorted(self._index.items(), key=lambda kv: kv[1].get("last_used", 0)):
+            if total <= self.max_bytes:
+                break
+            total -= entry.get("size", 0)
+            del self._index[key]
+            try:
+                (self.directory / f"{key}.json").unlink()
+            except FileNotFoundError:
+                pass
+            self.stats["evicted"] += 1
+
+    # ── reporting ───────────────────────────
+    def print_summary(self):
+        if not self.enabled:
+            return
+        s     = self.stats
+        total = s["hits"] + s["misses"]
+        rate  = s["hits"] / total * 100 if total else 0.0
+        print(f"🗄️  HTTP cache: {s['hits']} hits (304) / {s['misses']} misses "
+              f"({rate:.0f}% hit rate), {s['stored']} stored, {s['evicted']} evicted")
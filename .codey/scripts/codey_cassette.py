@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+# =============================================================================
+# codey_cassette.py
+# Record / replay HTTP cassettes for offline benchmarking + regression runs.
+#
+#   CODEY_CASSETTE_MODE=record  → real network, every request/response pair
+#                                  is written to the cassette at exit
+#   CODEY_CASSETTE_MODE=replay  → zero network, answers come from the cassette
+#   CODEY_CASSETTE=<path>       → default .codey/cassettes/run.json.gz
+#
+# Hooked in as a transport adapter on the shared session (codey_http.py), so
+# get_json_safe, the GraphQL collector and both star-report scripts are all
+# covered. The clock (codey_clock.py) is frozen to the recording time in both
+# modes — replay computes the very same decay, streaks and 24h windows.
+#
+# Requests are matched on method + full URL + body. Identical requests are
+# served in recorded order (the last answer repeats). The ETag cache is
+# switched off while a cassette is active: 304s depend on cache contents.
+# Replay from the same local state (.codey/events, repos, ...) as the recording.
+#
+# Place in: .codey/scripts/codey_cassette.py
+# =============================================================================
+# Licensed under Apache 2.0 & ESOL v1.1
+# https://github.com/ESOL-License/ESOL/
+# =============================================================================
+
+import atexit
+import gzip
+import json
+import os
+import threading
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+import codey_clock
+
+# ─────────────────────────────────────────────
+# CONFIG
+# ─────────────────────────────────────────────
+CASSETTE_MODE = os.environ.get("CODEY_CASSETTE_MODE", "").lower()   # "", "record", "replay"
+CASSETTE_PATH = Path(os.environ.get("CODEY_CASSETTE", ".codey/cassettes/run.json.gz"))
+
+# Only what Codey reads — keeps cassettes small
+KEEP_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Link", "Retry-After",
+                "X-RateLimit-Limit", "X-RateLimit-Remaining", "X-RateLimit-Reset",
+                "X-RateLimit-Resource")
+
+
+class CassetteMiss(requests.RequestException):
+    """Replay mode: the request was never recorded."""
+
+
+def cassette_active() -> bool:
+    return CASSETTE_MODE in ("record", "replay")
+
+
+def _key(method: str, url: str, body) -> str:
+    if isinstance(body, bytes):
+        body = body.decode("utf-8", "replace")
+    return f"{method} {url} {body or ''}"
+
+
+# ─────────────────────────────────────────────
+# CASSETTE
+# ─────────────────────────────────────────────
+
+class Cassette:
+    def __init__(self, path: Path):
+        self.path         = Path(path)
+        self.recorded_at  = None
+        self.interactions = defaultdict(list)   # key → [response dicts]
+        self._served      = defaultdict(int)
+        self._lock        = threading.Lock()
+
+    def load(self):
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            raw = json.load(f)
+        self.recorded_at = datetime.fromisoformat(raw["recorded_at"])
+        for item in raw["interactions"]:
+            self.interactions[item["key"]].append(item["response"])
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            items = [{"key": k, "response": r} for k, rs in self.interactions.items() for r in rs]
+        with gzip.open(self.path, "wt", encoding="utf-8") as f:
+            json.dump({"recorded_at": self.recorded_at.isoformat(), "interactions": items}, f)
+        print(f"📼 Cassette recorded: {len(items)} interactions → {self.path}")
+
+    def record(self, key: str, response: requests.Response):
+        entry = {
+            "status":  response.status_code,
+            "reason":  response.reason,
+            "headers": {h: response.headers[h] for h in KEEP_HEADERS if h in response.headers},
+            "body":    response.content.decode("utf-8", "replace"),
+        }
+        with self._lock:
+            self.interactions[key].append(entry)
+
+    def play(self, key: str):
+        with self._lock:
+            answers = self.interactions.get(key)
+            if not answers:
+                return None
+            i = min(self._served[key], len(answers) - 1)
+            self._served[key] += 1
+            return answers[i]
+
+
+class CassetteAdapter(HTTPAdapter):
+    """Transport adapter: records real responses or replays them without network."""
+
+    def __init__(self, cassette: Cassette, mode: str, **kwargs):
+        super().__init__(**kwargs)
+        self.cassette = cassette
+        self.mode     = mode
+
+    def send(self, request, **kwargs):
+        key = _key(request.method, request.url, request.body)
+        if self.mode == "replay":
+            entry = self.cassette.play(key)
+            if entry is None:
+                raise CassetteMiss(f"not in cassette: {request.method} {request.url}", request=request)
+            resp             = requests.Response()
+            resp.status_code = entry["status"]
+            resp.reason      = entry.get("reason")
+            resp.headers     = CaseInsensitiveDict(entry["headers"])
+            resp._content    = entry["body"].encode("utf-8")
+            resp.encoding    = "utf-8"
+            resp.url         = request.url
+            resp.request     = request
+            return resp
+
+        resp = super().send(request, **kwargs)
+        self.cassette.record(key, resp)
+        return resp
+
+
+# ─────────────────────────────────────────────
+# SETUP
+# ─────────────────────────────────────────────
+
+_cassette = None
+
+
+def get_cassette():
+    """Loads (replay) or starts (record) the cassette once per process and freezes the clock."""
+    global _cassette
+    if _cassette is not None or not cassette_active():
+        return _cassette
+
+    cassette = Cassette(CASSETTE_PATH)
+    if CASSETTE_MODE == "replay":
+        cassette.load()
+        print(f"📼 Cassette replay: {CASSETTE_PATH} (recorded {cassette.recorded_at:%Y-%m-%d %H:%M UTC})")
+    else:
+        cassette.recorded_at = datetime.now(timezone.utc)
+        atexit.register(cassette.save)
+        print(f"📼 Cassette recording → {CASSETTE_PATH}")
+    codey_clock.freeze(cassette.recorded_at)
+    _cassette = cassette
+    return _cassette
+
+
+def cassette_adapter(**pool_kwargs):
+    """HTTPAdapter for the shared session — a cassette adapter when a cassette is active."""
+    cassette = get_cassette()
+    if cassette is None:
+        return HTTPAdapter(**pool_kwargs)
+    return CassetteAdapter(cassette, CASSETTE_MODE, **pool_kwargs)
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+# =============================================================================
+# codey_clock.py
+# The one clock all Codey scripts read "now" from.
+#
+# Normally just datetime.now(). Cassette record/replay (codey_cassette.py)
+# freezes it to the recording time, so a replayed run computes exactly
+# the same decay, streaks, 24h windows and seasonal bonus as the original.
+#
+# Place in: .codey/scripts/codey_clock.py
+# =============================================================================
+# Licensed under Apache 2.0 & ESOL v1.1
+# https://github.com/ESOL-License/ESOL/
+# =============================================================================
+
+from datetime import datetime, timezone
+
+_frozen = None   # aware UTC datetime while frozen
+
+
+def now(tz=None) -> datetime:
+    """Drop-in for datetime.now(tz). Naive local time when tz is None, like the original."""
+    if _frozen is None:
+        return datetime.now(tz)
+    if tz is None:
+        return _frozen.astimezone().replace(tzinfo=None)
+    return _frozen.astimezone(tz)
+
+
+def freeze(at: datetime):
+    """Freezes the clock. Naive datetimes are taken as UTC."""
+    global _frozen
+    _frozen = at if at.tzinfo else at.replace(tzinfo=timezone.utc)
+
+
+def unfreeze():
+    global _frozen
+    _frozen = None
+
+
+def is_frozen() -> bool:
+    return _frozen is not None
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# =============================================================================
+# codey_fleet.py
+# Staleness-ordered scheduler for batch / org runs.
+#
+# should_run_full_update() only says run/skip for ONE state file. For a fleet
+# the question is: who first, and how many fit into the rate-limit budget?
+#
+#   1. read every user's state → hours since last_update (never run = oldest)
+#   2. users that are not due yet (run guard) are left out
+#   3. most stale first; equal staleness → cheaper first
+#   4. take users while their expected API cost fits the budget,
+#      everybody else is DEFERRED — not failed. Their last_update stays old,
+#      so they are at the front of the queue on the next invocation.
+#
+# Expected cost per user = moving average of the calls of earlier runs
+# (<out>/fleet_costs.json), CODEY_FLEET_DEFAULT_COST for users never seen.
+# Budget = CODEY_FLEET_BUDGET, else remaining core calls minus the optional
+# reserve of the rate limiter (known after a /rate_limit probe).
+#
+# Place in: .codey/scripts/codey_fleet.py
+# =============================================================================
+# Licensed under Apache 2.0 & ESOL v1.1
+# https://github.com/ESOL-License/ESOL/
+# =============================================================================
+
+import json
+import os
+from pathlib import Path
+
+from codey_atomic import atomic_write_json
+from codey_batch import user_paths
+from codey_ratelimit import rate_limiter, OPTIONAL_RESERVE
+from codey_state import state_store
+
+# ─────────────────────────────────────────────
+# CONFIG
+# ─────────────────────────────────────────────
+FLEET_BUDGET       = os.environ.get("CODEY_FLEET_BUDGET")            # calls, unset = from rate limit
+FLEET_DEFAULT_COST = int(os.environ.get("CODEY_FLEET_DEFAULT_COST", 50))
+COST_SMOOTHING     = 0.5   # weight of the newest run in the moving average
+
+# Results of users that were not actually run — they don't update the cost average
+NOT_RUN = ("skipped", "deferred", "elsewhere", "not due")
+
+
+def load_costs(out_dir: Path) -> dict:
+    try:
+        return json.loads((out_dir / "fleet_costs.json").read_text(encoding="utf-8"))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def save_costs(out_dir: Path, rows: list):
+    """Folds the calls of this run into the per-user moving average."""
+    costs = load_costs(out_dir)
+    for row in rows:
+        if row.get("error") or row.get("result") in NOT_RUN:
+            continue
+        calls = sum(row["calls"].values())
+        old   = costs.get(row["owner"].lower())
+        costs[row["owner"].lower()] = round(calls if old is None else
+                                            COST_SMOOTHING * calls + (1 - COST_SMOOTHING) * old, 1)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    atomic_write_json(out_dir / "fleet_costs.json", costs, indent=2, sort_keys=True)
+
+
+def available_budget() -> int:
+    """Calls we may spend on this fleet run, None = unknown (no limit applied)."""
+    if FLEET_BUDGET:
+        return int(FLEET_BUDGET)
+    b = rate_limiter.budget("core")
+    if not b["known"]:
+        return None
+    return max(0, b["remaining"] - int(b["limit"] * OPTIONAL_RESERVE))
+
+
+# ─────────────────────────────────────────────
+# PLAN
+# ─────────────────────────────────────────────
+
+def read_state(owner: str, path: str) -> dict:
+    """Current state of owner from the state store (codey_state.py), {} if none."""
+    return state_store.load(owner, path) or {}
+
+
+def expected_cost(costs: dict, owner: str) -> float:
+    return costs.get(owner.lower(), FLEET_DEFAULT_COST)
+
+
+def plan_fleet(owners: list, out_dir: Path, is_due, budget: int = None, accept=None) -> dict:
+    """
+    is_due(state) → (due, hours_since) — update_codey's should_run_full_update.
+    accept(owner, hours_since) → False for users of another shard (codey_shard.py).
+    Returns {'run', 'deferred', 'not_due', 'other_shard', 'budget', 'planned_cost'}
+    — 'run' in processing order.
+    """
+    costs = load_costs(out_dir)
+    queue, not_due, other = [], [], []
+    for owner in owners:
+        state_path, _ = user_paths(owner, out_dir)
+        due, hours = is_due(read_state(owner, state_path))
+        if not due:
+            not_due.append(owner)
+            continue
+        if accept and not accept(owner, hours):
+            other.append(owner)
+            continue
+        queue.append((hours, expected_cost(costs, owner), owner))
+
+    queue.sort(key=lambda q: (-q[0], q[1]))
+
+    run, deferred, spent = [], [], 0
+    for hours, cost, owner in queue:
+        if budget is not None and spent + cost > budget:
+            deferred.append(owner)
+            continue
+        run.append(owner)
+        spent += cost
+
+    return {"run": run, "deferred": deferred, "not_due": not_due, "other_shard": other,
+            "budget": budget, "planned_cost": round(spent)}
+
+
+def print_plan(plan: dict):
+    budget = "unlimited" if plan["budget"] is None else f"{plan['budget']} calls"
+    print(f"🗓️  Fleet plan: {len(plan['run'])} to run (~{plan['planned_cost']} calls, budget {budget}), "
+          f"{len(plan['deferred'])} deferred, {len(plan['not_due'])} not due"
+          + (f", {len(plan['other_shard'])} on other shards" if plan["other_shard"] else ""))
+    if plan["deferred"]:
+        shown = ", ".join(plan["deferred"][:10]) + (" …" if len(plan["deferred"]) > 10 else "")
+        print(f"    deferred to next run: {shown}")
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+# =============================================================================
+# codey_history.py
+# Long-horizon Codey history — append-only log with tiered retention.
+#
+# codey.json used to carry the last 30 history entries and nothing older.
+# Now every run is appended to a per-user log, codey.json only keeps the
+# newest CODEY_HISTORY_WINDOW entries (for the SVG / quick looks). The log is
+# the only source of truth — both state stores read that window through from
+# it (codey_state.py):
+#
+#   .codey/history/<owner>/daily.jsonl     one line per run, last 90 days
+#   .codey/history/<owner>/weekly.jsonl    ISO-week rollups, up to 2 years
+#   .codey/history/<owner>/monthly.jsonl   month rollups, kept forever
+#
+# Compaction moves whole weeks / months that aged out of a tier into the next
+# one — target first, so a compaction cut short by a crash is just repeated.
+# A rollup keeps what trend analysis needs: runs, summed commits / PRs,
+# health mean / min / max, best streak, mood counts, last tier.
+#
+# Range queries: query(start, end) returns all tiers for the range, oldest
+# first, each record marked with its resolution (run / week / month).
+#
+#   python .codey/scripts/codey_history.py <owner> [--from 2025-01-01] [--to 2025-12-31]
+#
+# Place in: .codey/scripts/codey_history.py
+# =============================================================================
+# Licensed under Apache 2.0 & ESOL v1.1
+# https://github.com/ESOL-License/ESOL/
+# =============================================================================
+
+import argparse
+import bisect
+import json
+import os
+import threading
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from codey_atomic import atomic_write
+from codey_clock import now as clock_now
+
+# ─────────────────────────────────────────────
+# CONFIG
+# ─────────────────────────────────────────────
+HISTORY_DIR    = Path(os.environ.get("CODEY_HISTORY_DIR", ".codey/history"))
+HISTORY_WINDOW = int(os.environ.get("CODEY_HISTORY_WINDOW", 14))     # entries kept in codey.json
+DAILY_DAYS     = int(os.environ.get("CODEY_HISTORY_DAILY_DAYS", 90))
+WEEKLY_DAYS    = int(os.environ.get("CODEY_HISTORY_WEEKLY_DAYS", 730))
+
+TIERS = ("daily", "weekly", "monthly")
+
+_locks      = {}
+_locks_lock = threading.Lock()
+
+
+def _owner_lock(owner: str) -> threading.Lock:
+    with _locks_lock:
+        return _locks.setdefault(owner.lower(), threading.Lock())
+
+
+def _parse(ts: str) -> datetime:
+    dt = datetime.fromisoformat(ts.replace("Z", "+00:00"))
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
+# ─────────────────────────────────────────────
+# ROLLUPS
+# ─────────────────────────────────────────────
+
+def _period(ts: str, resolution: str) -> tuple:
+    """(period label, first day, last day) of the week / month containing ts."""
+    day = _parse(ts).date()
+    if resolution == "week":
+        year, week, weekday = day.isocalendar()
+        start = day - timedelta(days=weekday - 1)
+        return f"{year}-W{week:02d}", start, start + timedelta(days=6)
+    start    = day.replace(day=1)
+    next_one = (start + timedelta(days=32)).replace(day=1)
+    return start.strftime("%Y-%m"), start, next_one - timedelta(days=1)
+
+
+def _as_rollup(record: dict) -> dict:
+    """A single run in rollup shape (runs=1) — rollups pass through unchanged."""
+    if "runs" in record:
+        return record
+    health = record.get("health", 0)
+    return {
+        "timestamp":     record["timestamp"],
+        "runs":          1,
+        "daily_commits": record.get("daily_commits", 0),
+        "daily_prs":     record.get("daily_prs", 0),
+        "health":        health,
+        "health_min":    health,
+        "health_max":    health,
+        "streak":        record.get("streak", 0),
+        "moods":         {record.get("mood", "neutral"): 1},
+        "tier":          record.get("tier"),
+    }
+
+
+def _merge(a: dict, b: dict) -> dict:
+    """Combines two rollups (b is the later one)."""
+    runs = a["runs"] + b["runs"]
+    return {
+        **a,
+        "runs":          runs,
+        "daily_commits": a["daily_commits"] + b["daily_commits"],
+        "daily_prs":     a["daily_prs"] + b["daily_prs"],
+        "health":        round((a["health"] * a["runs"] + b["health"] * b["runs"]) / runs, 2),
+        "health_min":    min(a["health_min"], b["health_min"]),
+        "health_max":    max(a["health_max"], b["health_max"]),
+        "streak":        max(a["streak"], b["streak"]),
+        "moods":         dict(Counter(a["moods"]) + Counter(b["moods"])),
+        "tier":          b.get("tier") or a.get("tier"),
+    }
+
+
+def rollup(records: list, resolution: str) -> list:
+    """Groups records (runs or finer rollups) into week / month rollups, oldest first."""
+    periods = {}
+    for record in sorted(records, key=lambda r: r["timestamp"]):
+        label, start, end = _period(record["timestamp"], resolution)
+        item = {**_as_rollup(record), "period": label, "resolution": resolution,
+                "start": start.isoformat(), "end": end.isoformat()}
+        item["timestamp"] = f"{start.isoformat()}T00:00:00+00:00"
+        periods[label] = _merge(periods[label], item) if label in periods else item
+    return [periods[k] for k in sorted(periods, key=lambda k: periods[k]["timestamp"])]
+
+
+# ─────────────────────────────────────────────
+# LOG
+# ─────────────────────────────────────────────
+
+class HistoryLog:
+    """The three tiers of one user."""
+
+    def __init__(self, owner: str, root: Path = None):
+        self.owner  = owner
+        self.folder = (root or HISTORY_DIR) / owner.lower()
+
+    def _path(self, tier: str) -> Path:
+        return self.folder / f"{tier}.jsonl"
+
+    def _read(self, tier: str) -> list:
+        try:
+            lines = self._path(tier).read_text(encoding="utf-8").splitlines()
+        except FileNotFoundError:
+            return []
+        records = []
+        for line in lines:
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue                    # torn last line of a killed run
+        return sorted(records, key=lambda r: r["timestamp"])
+
+    def _rewrite(self, tier: str, records: list):
+        atomic_write(self._path(tier), "".join(json.dumps(r) + "\n" for r in records))
+
+    def exists(self) -> bool:
+        return self._path("daily").exists()
+
+    # ── write ───────────────────────────────
+    def append(self, entry: dict, now: datetime = None):
+        """Appends one run, then compacts tiers that have entries past their cutoff."""
+        with _owner_lock(self.owner):
+            self.folder.mkdir(parents=True, exist_ok=True)
+            line = json.dumps(entry) + "\n"
+            with open(self._path("daily"), "a+b") as f:
+                if f.tell() > 0:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        line = "\n" + line     # finish a torn line, don't glue onto it
+                f.write(line.encode("utf-8"))
+                f.flush()
+                os.fsync(f.fileno())
+            self._compact(now or clock_now(timezone.utc))
+
+    def _compact(self, now: datetime):
+        self._promote("daily", "weekly", "week", (now - timedelta(days=DAILY_DAYS)).date())
+        self._promote("weekly", "monthly", "month", (now - timedelta(days=WEEKLY_DAYS)).date())
+
+    def _promote(self, tier: str, target: str, resolution: str, cutoff):
+        """Moves whole periods that ended before cutoff from tier into target rollups."""
+        records = self._read(tier)
+        old     = [r for r in records if _period(r["timestamp"], resolution)[2] < cutoff]
+        if not old:
+            return
+        existing = self._read(target)
+        done     = {r["period"] for r in existing}
+        # Periods move complete, so one that is already in target came from an
+        # interrupted earlier compaction — not added twice.
+        fresh = [r for r in rollup(old, resolution) if r["period"] not in done]
+        if fresh:
+            self._rewrite(target, sorted(existing + fresh, key=lambda r: r["timestamp"]))
+        self._rewrite(tier, [r for r in records if r not in old])
+
+    # ── read ────────────────────────────────
+    def recent(self, n: int = HISTORY_WINDOW) -> list:
+        """Newest n runs, oldest first."""
+        return self._read("daily")[-n:] if n > 0 else []
+
+    def query(self, start: str = None, end: str = None) -> list:
+        """
+        Every record with start <= timestamp <= end (ISO dates or datetimes),
+        all tiers, oldest first. Runs get resolution 'run'; rollups overlap
+        the range with any day of their period.
+        """
+        lo  = start or ""
+        hi  = (end + "T99") if end and len(end) == 10 else (end or "~")
+        out = []
+        for tier in reversed(TIERS):
+            records = self._read(tier)
+            if tier == "daily":
+                keys = [r["timestamp"] for r in records]
+                out += [{**r, "resolution": "run"}
+                        for r in records[bisect.bisect_left(keys, lo):bisect.bisect_right(keys, hi)]]
+            else:
+                ends = [r["end"] for r in records]
+                out += [r for r in records[bisect.bisect_left(ends, lo[:10]):]
+                        if r["start"] <= hi[:10]]
+        return sorted(out, key=lambda r: r["timestamp"])
+
+
+def record_history(owner: str, entry: dict, previous: list = None) -> list:
+    """
+    Appends entry to owner's log and returns the recent window for codey.json.
+    previous = the old codey['history'] — seeds the log of users that had none yet.
+    """
+    log = HistoryLog(owner)
+    if not log.exists() and previous:
+        with _owner_lock(owner):
+            log.folder.mkdir(parents=True, exist_ok=True)
+            log._rewrite("daily", sorted((e for e in previous if e.get("timestamp")),
+                                         key=lambda e: e["timestamp"]))
+        print(f"📜 History log started with {len(previous)} entries from codey.json")
+    log.append(entry)
+    return log.recent(HISTORY_WINDOW)
+
+
+# ─────────────────────────────────────────────
+# CLI
+# ─────────────────────────────────────────────
+
+def main():
+    parser = argparse.ArgumentParser(description="Query a user's long-horizon Codey history.")
+    parser.add_argument("owner")
+    parser.add_argument("--from", dest="start", help="first day (YYYY-MM-DD)")
+    parser.add_argument("--to", dest="end", help="last day (YYYY-MM-DD)")
+    args = parser.parse_args()
+
+    rows = HistoryLog(args.owner).query(args.start, args.end)
+    for r in rows:
+        when  = r.get("period") or r["timestamp"][:16].replace("T", " ")
+        mood  = r.get("mood") or max(r.get("moods", {"?": 1}).items(), key=lambda m: m[1])[0]
+        runs  = f"{r.get('runs', 1):>3} run(s)"
+        print(f"{when:<16} {r['resolution']:<5} {runs}  commits {r.get('daily_commits', 0):>4}  "
+              f"prs {r.get('daily_prs', 0):>3}  health {r.get('health', 0):>5.1f}  "
+              f"streak {r.get('streak', 0):>4}  {mood}")
+    print(f"{len(rows)} record(s)")
+
+
+if __name__ == "__main__":
+    main()
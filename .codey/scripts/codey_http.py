@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# =============================================================================
+# codey_http.py
+# Shared HTTP layer for all Codey scripts.
+# One pooled keep-alive session per process — no TCP+TLS handshake per page.
+#
+# CODEY_CASSETTE_MODE=record|replay swaps the transport (codey_cassette.py).
+#
+# Used by:
+#   - update_codey.py                       (get_json_safe, fetch_real_stars)
+#   - .codey/scripts/codey_star_report.py   (GraphQL)
+#   - .codey/scripts/update_stats.py        (GraphQL)
+#
+# Place in: .codey/scripts/codey_http.py
+# =============================================================================
+# Licensed under Apache 2.0 & ESOL v1.1
+# https://github.com/ESOL-License/ESOL/
+# =============================================================================
+
+import contextvars
+import os
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import requests
+
+from codey_cassette import cassette_adapter, get_cassette
+
+# ─────────────────────────────────────────────
+# CONFIG
+# ─────────────────────────────────────────────
+# CODEY_POOL_CONNECTIONS = number of hosts kept in the pool (api.github.com + a few)
+# CODEY_POOL_MAXSIZE     = open keep-alive sockets per host
+# CODEY_POOL_BLOCK       = "true" → wait for a free socket instead of opening extra ones
+# CODEY_HTTP_TIMEOUT     = seconds per request
+# CODEY_API_URL          = API base URL (e.g. http://127.0.0.1:8787 for codey_stub_api.py)
+POOL_CONNECTIONS = int(os.environ.get("CODEY_POOL_CONNECTIONS", 4))
+POOL_MAXSIZE     = int(os.environ.get("CODEY_POOL_MAXSIZE", 10))
+POOL_BLOCK       = os.environ.get("CODEY_POOL_BLOCK", "false").lower() == "true"
+HTTP_TIMEOUT     = float(os.environ.get("CODEY_HTTP_TIMEOUT", 20))
+API_URL          = os.environ.get("CODEY_API_URL", "https://api.github.com").rstrip("/")
+GRAPHQL_URL      = f"{API_URL}/graphql"
+
+_session      = None
+_session_lock = threading.Lock()
+
+# Requests per kind ("rest", "graphql") — printed at the end of a run
+request_counts = Counter()
+_counts_lock   = threading.Lock()
+# Extra per-scope counter (e.g. one user of a batch run) — see request_scope()
+_scope         = contextvars.ContextVar("codey_request_scope", default=None)
+
+# Cassette record/replay freezes the clock — must happen before any script reads "now"
+get_cassette()
+
+
+# ─────────────────────────────────────────────
+# SESSION
+# ─────────────────────────────────────────────
+
+def build_session(pool_connections=None, pool_maxsize=None, pool_block=None) -> requests.Session:
+    """Creates a new Session with a tuned connection pool mounted for http + https."""
+    adapter = cassette_adapter(   # plain HTTPAdapter unless a cassette is active
+        pool_connections=pool_connections or POOL_CONNECTIONS,
+        pool_maxsize=pool_maxsize or POOL_MAXSIZE,
+        pool_block=POOL_BLOCK if pool_block is None else pool_block,
+    )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session() -> requests.Session:
+    """Returns the shared process-wide Session (created on first use, thread-safe)."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = build_session()
+    return _session
+
+
+def close_session():
+    """Closes the shared Session and drops all pooled sockets."""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+# ─────────────────────────────────────────────
+# REQUEST COUNTER
+# ─────────────────────────────────────────────
+
+def count_request(kind: str, n: int = 1):
+    """Counts one outgoing request of the given kind (thread-safe)."""
+    scope = _scope.get()
+    with _counts_lock:
+        request_counts[kind] += n
+        if scope is not None:
+            scope[kind] += n
+
+
+@contextmanager
+def request_scope():
+    """
+    Counts the requests made inside the with-block separately (yields a Counter).
+    Follows the caller into ScopedThreadPool workers, not into plain threads.
+    """
+    counts = Counter()
+    token  = _scope.set(counts)
+    try:
+        yield counts
+    finally:
+        _scope.reset(token)
+
+
+class ScopedThreadPool(ThreadPoolExecutor):
+    """ThreadPoolExecutor whose workers run in the submitter's context (request scope)."""
+
+    def submit(self, fn, /, *args, **kwargs):
+        return super().submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+
+def print_request_summary(label: str = ""):
+    total = sum(request_counts.values())
+    parts = ", ".join(f"{k}={v}" for k, v in sorted(request_counts.items())) or "none"
+    label = f" ({label})" if label else ""
+    print(f"📡 API requests{label}: {total} total — {parts}")
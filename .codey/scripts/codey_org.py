@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# =============================================================================
+# codey_org.py
+# Organization mode — one Codey per public member plus an org aggregate.
+#
+#   python update_codey.py --org acme
+#
+# Members run through the batch pool (codey_batch.py), output goes to
+#   codey_batch/<org>/<member>/codey.json + codey.svg
+#   codey_batch/<org>/org_summary.json
+#
+# Shared work is paid once per org, not once per member:
+#   - org repos are listed once and handed to every member's commit fallback,
+#     /commits of an org repo is one request for all members (filtered locally)
+#   - /languages and single repos go through the shared cache + single-flight
+#
+# Aggregate: tier distribution, average social score / level, top streaks.
+#
+# Place in: .codey/scripts/codey_org.py
+# =============================================================================
+# Licensed under Apache 2.0 & ESOL v1.1
+# https://github.com/ESOL-License/ESOL/
+# =============================================================================
+
+from collections import Counter
+from datetime import timezone
+from pathlib import Path
+
+from codey_atomic import atomic_write_json
+from codey_batch import user_paths
+from codey_clock import now as clock_now
+from codey_state import state_store
+
+TOP_STREAKS = 10
+
+
+def org_aggregate(org: str, rows: list, out_dir: Path) -> dict:
+    """Reads every member's state after the batch and writes org_summary.json."""
+    states = {}
+    for row in rows:
+        if row["error"]:
+            continue
+        state_path, _ = user_paths(row["owner"], out_dir)
+        state = state_store.load(row["owner"], state_path)
+        if state is not None:
+            states[row["owner"]] = state
+
+    tiers   = Counter(s.get("brutal_stats", {}).get("tier", "unknown") for s in states.values())
+    social  = [s.get("brutal_stats", {}).get("social_score", 1.0) for s in states.values()]
+    levels  = [s.get("level", 1) for s in states.values()]
+    streaks = sorted(((s.get("streak", 0), owner) for owner, s in states.items()), reverse=True)
+
+    summary = {
+        "org":               org,
+        "generated_at":      clock_now(timezone.utc).isoformat(),
+        "members":           len(rows),
+        "scored":            len(states),
+        "failed":            [r["owner"] for r in rows if r["error"]],
+        "tier_distribution": dict(tiers.most_common()),
+        "avg_social_score":  round(sum(social) / len(social), 3) if social else None,
+        "avg_level":         round(sum(levels) / len(levels), 2) if levels else None,
+        "total_commits":     sum(s.get("total_commits", 0) for s in states.values()),
+        "top_streaks":       [{"owner": owner, "streak": streak} for streak, owner in streaks[:TOP_STREAKS]],
+        "api_calls":         sum(sum(r["calls"].values()) for r in rows),
+    }
+    out_dir.mkdir(parents=True, exist_ok=True)
+    atomic_write_json(out_dir / "org_summary.json", summary, indent=2)
+    return summary
+
+
+def print_org_summary(summary: dict):
+    print("")
+    print("=" * 54)
+    print(f"  🏢 ORG {summary['org'].upper()} — {summary['scored']}/{summary['members']} members scored")
+    print("=" * 54)
+    widest = max(summary["tier_distribution"].values(), default=1)
+    for tier, n in summary["tier_distribution"].items():
+        print(f"  {tier:<12} {n:>4}  {'█' * max(1, round(n * 30 / widest))}")
+    if summary["avg_social_score"] is not None:
+        print(f"  Avg social score: {summary['avg_social_score']:.2f}x | Avg level: {summary['avg_level']:.1f}")
+    print(f"  Total commits:    {summary['total_commits']} | API calls: {summary['api_calls']}")
+    if summary["top_streaks"]:
+        print("  Top streaks:")
+        for entry in summary["top_streaks"]:
+            print(f"    {entry['streak']:>4}  {entry['owner']}")
+    if summary["failed"]:
+        print(f"  Failed: {', '.join(summary['failed'])}")
+    print("=" * 54)
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# =============================================================================
+# codey_ratelimit.py
+# Rate-limit aware request scheduler with adaptive throttling.
+#
+# Tracks the remaining budget per resource (core / graphql / search) from
+# X-RateLimit-* headers and Retry-After, and decides per request:
+#   - plenty left      → go
+#   - getting low      → spread requests over the rest of the reset window
+#                        (one shared slot queue, also across worker threads)
+#   - below reserve    → skip OPTIONAL calls (languages, fallback commits)
+#   - at the floor     → pause until reset (or refuse if the wait is too long)
+#
+# Better a skipped language refresh than silent {} data and bogus scores.
+#
+# Place in: .codey/scripts/codey_ratelimit.py
+# =============================================================================
+# Licensed under Apache 2.0 & ESOL v1.1
+# https://github.com/ESOL-License/ESOL/
+# =============================================================================
+
+import os
+import sys
+import threading
+import time
+
+# ─────────────────────────────────────────────
+# CONFIG
+# ─────────────────────────────────────────────
+# CODEY_RL_OPTIONAL_RESERVE = fraction of the limit kept back — optional calls stop below it
+# CODEY_RL_PACE_BELOW       = fraction of the limit where request spreading starts
+# CODEY_RL_MAX_PACE         = max seconds between two requests while spreading
+# CODEY_RL_HARD_FLOOR       = remaining calls where we stop and wait for reset
+# CODEY_RL_MAX_WAIT         = max seconds we are willing to sleep for a reset
+OPTIONAL_RESERVE = float(os.environ.get("CODEY_RL_OPTIONAL_RESERVE", 0.10))
+PACE_BELOW       = float(os.environ.get("CODEY_RL_PACE_BELOW", 0.25))
+MAX_PACE         = float(os.environ.get("CODEY_RL_MAX_PACE", 2.0))
+HARD_FLOOR       = int(os.environ.get("CODEY_RL_HARD_FLOOR", 5))
+MAX_WAIT         = float(os.environ.get("CODEY_RL_MAX_WAIT", 900))
+
+
+# ─────────────────────────────────────────────
+# SCHEDULER
+# ─────────────────────────────────────────────
+
+class RateLimitScheduler:
+    """Central budget tracker. One instance per process (see rate_limiter below)."""
+
+    def __init__(self):
+        self._lock    = threading.Lock()
+        self._budgets = {}   # resource → {'limit', 'remaining', 'reset', 'blocked_until', 'next_at'}
+        self.stats    = {"paced": 0, "paused": 0, "skipped": 0, "refused": 0, "slept_s": 0.0}
+
+    # ── state ───────────────────────────────
+    def budget(self, resource: str = "core") -> dict:
+        """Current budget for a resource. Unknown (no response yet) = not low."""
+        with self._lock:
+            b = dict(self._budgets.get(resource, {}))
+        limit     = b.get("limit")
+        remaining = b.get("remaining")
+        b["known"] = limit is not None and remaining is not None
+        b["low"]   = b["known"] and remaining < limit * OPTIONAL_RESERVE
+        return b
+
+    def is_low(self, resource: str = "core") -> bool:
+        """True when optional work should be skipped to protect the rest of the run."""
+        return self.budget(resource)["low"]
+
+    # ── request side ────────────────────────
+    def before_request(self, resource: str = "core", essential: bool = True) -> bool:
+        """
+        Blocks (sleeps) as long as needed and returns True if the request may go.
+        Returns False if it must not be sent (optional + low, or reset too far away).
+        """
+        now = time.time()
+        with self._lock:
+            b = self._budgets.get(resource)
+            if not b:
+                return True
+
+            blocked_until = b.get("blocked_until", 0)
+            remaining     = b.get("remaining")
+            limit         = b.get("limit") or 1
+            reset         = b.get("reset") or now
+
+            if not essential and remaining is not None and remaining < limit * OPTIONAL_RESERVE:
+                self.stats["skipped"] += 1
+                return False
+
+            wait  = 0.0
+            pause = False
+            if blocked_until > now:
+                wait, pause = blocked_until - now, True
+            elif remaining is not None and remaining <= HARD_FLOOR and reset > now:
+                wait, pause = reset - now + 1, True
+            elif remaining is not None and remaining < limit * PACE_BELOW and reset > now:
+                # Every caller reserves its own slot — parallel workers line up
+                # one pace apart instead of all sleeping the same delay and firing together
+                pace         = min(MAX_PACE, (reset - now) / max(remaining, 1))
+                b["next_at"] = max(now, b.get("next_at", 0)) + pace
+                wait         = b["next_at"] - now
+                self.stats["paced"] += 1
+
+            if wait > MAX_WAIT:
+                self.stats["refused"] += 1
+                print(f"⛔ Rate limit ({resource}): reset in {wait / 60:.0f} min — request refused.",
+                      file=sys.stderr)
+                return False
+            if pause:
+                self.stats["paused"] += 1
+                print(f"⏳ Rate limit ({resource}): pausing {wait:.0f}s until reset.", file=sys.stderr)
+
+            # Count the call locally so concurrent workers don't all see the same budget
+            if remaining is not None:
+                b["remaining"] = max(0, remaining - 1)
+            self.stats["slept_s"] += wait
+
+        if wait > 0:
+            time.sleep(wait)
+        return True
+
+    # ── response side ───────────────────────
+    def after_response(self, status_code: int, headers, resource: str = None):
+        """Updates the budget from X-RateLimit-* / Retry-After response headers."""
+        if headers is None:
+            return
+        resource = headers.get("X-RateLimit-Resource") or resource or "core"
+        with self._lock:
+            b = self._budgets.setdefault(resource, {})
+            try:
+                if headers.get("X-RateLimit-Limit") is not None:
+                    b["limit"] = int(headers["X-RateLimit-Limit"])
+                if headers.get("X-RateLimit-Remaining") is not None:
+                    b["remaining"] = int(headers["X-RateLimit-Remaining"])
+                if headers.get("X-RateLimit-Reset") is not None:
+                    b["reset"] = int(headers["X-RateLimit-Reset"])
+            except (TypeError, ValueError):
+                pass
+
+            # Primary or secondary limit hit → hold everything for this resource
+            if status_code in (403, 429):
+                retry_after = headers.get("Retry-After")
+                if retry_after and str(retry_after).isdigit():
+                    b["blocked_until"] = time.time() + int(retry_after)
+                elif b.get("remaining") == 0 and b.get("reset"):
+                    b["blocked_until"] = b["reset"] + 1
+
+    # ── reporting ───────────────────────────
+    def print_summary(self):
+        with self._lock:
+            budgets = {k: dict(v) for k, v in self._budgets.items()}
+            s = dict(self.stats)
+        for resource, b in sorted(budgets.items()):
+            if b.get("remaining") is None:
+                continue
+            reset = datetime_str(b.get("reset"))
+            print(f"🚦 Rate limit {resource}: {b['remaining']}/{b.get('limit', '?')} left (reset {reset})")
+        if any(s[k] for k in ("paced", "paused", "skipped", "refused")):
+            print(f"🚦 Throttling: {s['paced']} paced, {s['paused']} paused, "
+                  f"{s['skipped']} optional skipped, {s['refused']} refused, {s['slept_s']:.0f}s slept")
+
+
+def datetime_str(epoch) -> str:
+    if not epoch:
+        return "?"
+    return time.strftime("%H:%M UTC", time.gmtime(epoch))
+
+
+# Shared process-wide instance
+rate_limiter = RateLimitScheduler()
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+# =============================================================================
+# codey_retry.py
+# Retries with jittered exponential backoff + per-endpoint circuit breaker.
+#
+# One 502 or timeout must not truncate a paginated dataset anymore.
+# Retried: connection errors, timeouts, 5xx, 429 and 403 with Retry-After
+# (secondary rate limit). Only for idempotent calls — GETs and GraphQL queries.
+#
+# Circuit breaker: after N failed attempts in a row an endpoint is "open"
+# for a cooldown — calls fail fast instead of hammering it. After the
+# cooldown one trial call is let through (half-open).
+#
+# Retry-After is honoured up to CODEY_RETRY_AFTER_MAX seconds. A longer wait
+# is not slept in the retry loop (it would hold a worker thread for minutes):
+# the response is handed back and the rate limiter's blocked_until, set from
+# the same header, holds further calls.
+#
+# Deadlines: inside `with request_deadline(seconds)` (follows the caller into
+# ScopedThreadPool workers) no call starts after the deadline, no retry sleeps
+# past it, and request_timeout() shrinks the socket timeout to the time left —
+# so work that is given up on also stops, instead of running on in the background.
+#
+# Every retry and every trip is recorded and printed in the run summary.
+#
+# Place in: .codey/scripts/codey_retry.py
+# =============================================================================
+# Licensed under Apache 2.0 & ESOL v1.1
+# https://github.com/ESOL-License/ESOL/
+# =============================================================================
+
+import contextvars
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+import requests
+
+# ─────────────────────────────────────────────
+# CONFIG
+# ─────────────────────────────────────────────
+RETRIES           = int(os.environ.get("CODEY_RETRIES", 3))
+BACKOFF_BASE      = float(os.environ.get("CODEY_BACKOFF_BASE", 0.5))
+BACKOFF_MAX       = float(os.environ.get("CODEY_BACKOFF_MAX", 8.0))
+RETRY_AFTER_MAX   = float(os.environ.get("CODEY_RETRY_AFTER_MAX", 30))
+BREAKER_THRESHOLD = int(os.environ.get("CODEY_BREAKER_THRESHOLD", 5))
+BREAKER_COOLDOWN  = float(os.environ.get("CODEY_BREAKER_COOLDOWN", 60))
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+_deadline = contextvars.ContextVar("codey_request_deadline", default=None)
+
+
+def endpoint_key(method: str, url: str) -> str:
+    """Groups URLs per endpoint: /repos/a/b/languages → GET /repos/*/*/languages."""
+    parts = urlparse(url).path.strip("/").split("/")
+    if parts and parts[0] == "users" and len(parts) > 1:
+        parts[1] = "*"
+    elif parts and parts[0] == "repos" and len(parts) > 2:
+        parts[1:3] = ["*", "*"]
+    return f"{method} /{'/'.join(parts)}"
+
+
+def backoff_delay(attempt: int) -> float:
+    """Full jitter: random between 0 and min(max, base * 2^attempt)."""
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt)))
+
+
+def retry_after_seconds(response) -> float:
+    """Retry-After in seconds (only the delta-seconds form GitHub uses), else None."""
+    if response is None:
+        return None
+    value = response.headers.get("Retry-After")
+    return float(value) if value and value.isdigit() else None
+
+
+def is_retryable(response) -> bool:
+    if response.status_code in RETRY_STATUS:
+        return True
+    return response.status_code == 403 and retry_after_seconds(response) is not None
+
+
+# ─────────────────────────────────────────────
+# CIRCUIT BREAKER
+# ─────────────────────────────────────────────
+
+class CircuitBreaker:
+    """Per-endpoint breaker: closed → open (fail fast) → half-open (one trial)."""
+
+    def __init__(self, threshold: int = BREAKER_THRESHOLD, cooldown: float = BREAKER_COOLDOWN):
+        self.threshold = threshold
+        self.cooldown  = cooldown
+        self._lock     = threading.Lock()
+        self._failures = Counter()
+        self._open     = {}   # endpoint → open_until
+
+    def allow(self, endpoint: str) -> bool:
+        with self._lock:
+            open_until = self._open.get(endpoint)
+            if open_until is None:
+                return True
+            if time.time() >= open_until:
+                # half-open: let one trial through, re-open right away if it fails
+                self._failures[endpoint] = self.threshold - 1
+                del self._open[endpoint]
+                return True
+            return False
+
+    def record_success(self, endpoint: str):
+        with self._lock:
+            self._failures.pop(endpoint, None)
+
+    def record_failure(self, endpoint: str) -> bool:
+        """Counts a failure. Returns True if this one tripped the breaker."""
+        with self._lock:
+            self._failures[endpoint] += 1
+            if self._failures[endpoint] >= self.threshold and endpoint not in self._open:
+                self._open[endpoint] = time.time() + self.cooldown
+                return True
+            return False
+
+
+# ─────────────────────────────────────────────
+# STATS
+# ─────────────────────────────────────────────
+
+class RetryStats:
+    """Collects retries, trips and short-circuits for the run summary."""
+
+    def __init__(self):
+        self._lock          = threading.Lock()
+        self.retries        = Counter()   # (endpoint, reason) → count
+        self.trips          = Counter()   # endpoint → count
+        self.short_circuits = Counter()   # endpoint → calls refused while open
+        self.slept_s        = 0.0
+
+    def retry(self, endpoint: str, reason: str, delay: float):
+        with self._lock:
+            self.retries[(endpoint, reason)] += 1
+            self.slept_s += delay
+
+    def trip(self, endpoint: str):
+        with self._lock:
+            self.trips[endpoint] += 1
+
+    def short_circuit(self, endpoint: str):
+        with self._lock:
+            self.short_circuits[endpoint] += 1
+
+    def print_summary(self):
+        with self._lock:
+            if not (self.retries or self.trips or self.short_circuits):
+                return
+            total = sum(self.retries.values())
+            print(f"🔁 Retries: {total} ({self.slept_s:.1f}s backoff)")
+            for (endpoint, reason), n in self.retries.most_common():
+                print(f"    {n:>3}× {reason:<14} {endpoint}")
+            for endpoint, n in self.trips.items():
+                print(f"⚡ Circuit breaker tripped {n}× — {endpoint} "
+                      f"({self.short_circuits[endpoint]} calls refused)")
+
+
+breaker     = CircuitBreaker()
+retry_stats = RetryStats()
+
+
+# ─────────────────────────────────────────────
+# DEADLINE
+# ─────────────────────────────────────────────
+
+@contextmanager
+def request_deadline(seconds: float):
+    """Every request inside the with-block has to be done within seconds from now."""
+    token = _deadline.set(time.monotonic() + seconds)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def time_left() -> float:
+    """Seconds until the active deadline, None without one."""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def request_timeout(default: float) -> float:
+    """Socket timeout for the next request: default, cut down to the time left."""
+    left = time_left()
+    return default if left is None else max(0.1, min(default, left))
+
+
+# ─────────────────────────────────────────────
+# RETRY LOOP
+# ─────────────────────────────────────────────
+
+def request_with_retry(send, endpoint: str, retries: int = None):
+    """
+    Calls send() (→ requests.Response, may raise) with retries + breaker.
+    Returns (response, error). response is the last one received (maybe a 5xx),
+    error is the last exception or a message when nothing was received.
+    """
+    retries = RETRIES if retries is None else retries
+    left    = time_left()
+    if left is not None and left <= 0:
+        return None, f"deadline passed for {endpoint}"
+    if not breaker.allow(endpoint):
+        retry_stats.short_circuit(endpoint)
+        return None, f"circuit open for {endpoint}"
+
+    response, error = None, None
+    for attempt in range(retries + 1):
+        try:
+            response, error = send(), None
+        except (requests.ConnectionError, requests.Timeout) as e:
+            response, error = None, e
+            reason = "timeout" if isinstance(e, requests.Timeout) else "connection"
+        else:
+            if not is_retryable(response):
+                breaker.record_success(endpoint)
+                return response, None
+            reason = f"HTTP {response.status_code}"
+
+        if breaker.record_failure(endpoint):
+            retry_stats.trip(endpoint)
+            print(f"⚡ Circuit breaker open: {endpoint} ({BREAKER_COOLDOWN:.0f}s cooldown)", file=sys.stderr)
+            break
+        if attempt == retries:
+            break
+        retry_after = retry_after_seconds(response)
+        if retry_after is not None and retry_after > RETRY_AFTER_MAX:
+            print(f"⏳ Retry-After {retry_after:.0f}s > {RETRY_AFTER_MAX:.0f}s — {endpoint} "
+                  f"left to the rate limiter", file=sys.stderr)
+            break
+        delay = retry_after or backoff_delay(attempt)
+        left  = time_left()
+        if left is not None and delay >= left:
+            break                           # the next attempt would end after the deadline
+        retry_stats.retry(endpoint, reason, delay)
+        time.sleep(delay)
+
+    return response, error
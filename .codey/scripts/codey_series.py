@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+# =============================================================================
+# codey_series.py
+# Columnar time series of the star statistics — analytics without JSON parsing.
+#
+# stats_history.jsonl stays the source of truth (full records incl. top10).
+# Next to it, the numeric fields are kept as one packed binary column each:
+#
+#   .codey/series/meta.json            rows, JSONL bytes consumed, missing counts
+#   .codey/series/date.i32             day ordinal per row
+#   .codey/series/run_at.i64           run time (epoch seconds)
+#   .codey/series/<field>.f64          one float64 per row, NaN = not in record
+#
+# Columns are array.array buffers (stdlib — numpy is not a dependency) in
+# little-endian order. sum / min / max / fsum run in C over the whole buffer,
+# range selection is a bisect on the date column plus a slice.
+#
+# Sync: like the index of codey_stats_log.py — only the JSONL bytes after the
+# consumed count are parsed and appended; columns first, meta last (extra
+# rows from an interrupted sync are cut off). A shrunk JSONL = full rebuild.
+# Derived data like the index: git-ignored, kept across Actions runs by cache.
+#
+#   python .codey/scripts/codey_series.py [field ...] [--from DATE] [--to DATE]
+#
+# Place in: .codey/scripts/codey_series.py
+# =============================================================================
+# Licensed under Apache 2.0 & ESOL v1.1
+# https://github.com/ESOL-License/ESOL/
+# =============================================================================
+
+import argparse
+import bisect
+import json
+import math
+import sys
+from array import array
+from datetime import date, datetime, timezone
+from pathlib import Path
+
+from codey_atomic import atomic_write_json
+from codey_stats_log import STATS_JSONL
+
+# ─────────────────────────────────────────────
+# CONFIG
+# ─────────────────────────────────────────────
+SERIES_DIR     = Path(".codey/series")
+SERIES_VERSION = 1
+FIELDS = (
+    "own_active", "own_archived", "own_stars_active", "own_stars_archived", "own_stars_total",
+    "own_zero_stars", "fork_active", "fork_stars", "fork_ratio", "grand_total_stars",
+)
+# column → (typecode, file suffix)
+_COLUMNS = {"date": ("i", "i32"), "run_at": ("q", "i64"), **{f: ("d", "f64") for f in FIELDS}}
+_NAN     = float("nan")
+
+
+def _day(record: dict) -> int:
+    return date.fromisoformat(record["date"][:10]).toordinal()
+
+
+def _run_at(record: dict) -> int:
+    try:
+        run = datetime.strptime(record.get("run_utc", ""), "%Y-%m-%d %H:%M UTC")
+    except ValueError:
+        run = datetime.fromordinal(_day(record))
+    return int(run.replace(tzinfo=timezone.utc).timestamp())
+
+
+def _number(value) -> float:
+    return float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else _NAN
+
+
+class StatsSeries:
+    """Column files of one JSONL log."""
+
+    def __init__(self, jsonl=STATS_JSONL, folder=SERIES_DIR):
+        self.jsonl  = Path(jsonl)
+        self.folder = Path(folder)
+
+    # ── files ───────────────────────────────
+    def _path(self, column: str) -> Path:
+        return self.folder / f"{column}.{_COLUMNS[column][1]}"
+
+    def _meta(self) -> dict:
+        try:
+            meta = json.loads((self.folder / "meta.json").read_text(encoding="utf-8"))
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        return meta if meta.get("version") == SERIES_VERSION and meta.get("fields") == list(FIELDS) else None
+
+    def _read(self, column: str, rows: int) -> array:
+        col = array(_COLUMNS[column][0])
+        with open(self._path(column), "rb") as f:
+            col.fromfile(f, rows)
+        if sys.byteorder == "big":
+            col.byteswap()
+        return col
+
+    # ── sync ────────────────────────────────
+    def sync(self) -> dict:
+        """Appends the JSONL lines not in the columns yet. Returns the meta."""
+        size = self.jsonl.stat().st_size if self.jsonl.exists() else 0
+        meta = self._meta()
+        if meta is None or meta["source_bytes"] > size or not all(self._path(c).exists() for c in _COLUMNS):
+            meta = {"version": SERIES_VERSION, "fields": list(FIELDS), "rows": 0, "source_bytes": 0,
+                    "sorted": True, "missing": {f: 0 for f in FIELDS}}
+            self.folder.mkdir(parents=True, exist_ok=True)
+            for column in _COLUMNS:
+                self._path(column).write_bytes(b"")
+        if meta["source_bytes"] == size:
+            return meta
+
+        new = {column: array(code) for column, (code, _) in _COLUMNS.items()}
+        consumed = meta["source_bytes"]
+        with open(self.jsonl, "rb") as f:
+            f.seek(consumed)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break                   # still being written
+                consumed += len(line)
+                try:
+                    record = json.loads(line)
+                    day    = _day(record)
+                except (json.JSONDecodeError, KeyError, ValueError, AttributeError):
+                    continue
+                new["date"].append(day)
+                new["run_at"].append(_run_at(record))
+                for field in FIELDS:
+                    value = _number(record.get(field))
+                    new[field].append(value)
+                    meta["missing"][field] += value != value
+
+        added = len(new["date"])
+        if added:
+            last_day = self._read("date", meta["rows"])[-1] if meta["rows"] else None
+            days     = ([last_day] if last_day is not None else []) + new["date"].tolist()
+            meta["sorted"] = meta["sorted"] and all(a <= b for a, b in zip(days, days[1:]))
+            for column, values in new.items():
+                if sys.byteorder == "big":
+                    values.byteswap()
+                with open(self._path(column), "r+b") as out:
+                    out.seek(meta["rows"] * values.itemsize)   # drops rows of an interrupted sync
+                    values.tofile(out)
+                    out.truncate()
+        meta["rows"]        += added
+        meta["source_bytes"] = consumed
+        atomic_write_json(self.folder / "meta.json", meta, durable=False)
+        return meta
+
+    # ── query ───────────────────────────────
+    def columns(self, names=FIELDS, start=None, end=None) -> dict:
+        """{'date': ..., 'run_at': ..., name: ...} arrays for start <= date <= end (ISO dates)."""
+        meta  = self.sync()
+        dates = self._read("date", meta["rows"])
+        lo_day = date.fromisoformat(start).toordinal() if start else -sys.maxsize
+        hi_day = date.fromisoformat(end).toordinal() if end else sys.maxsize
+        if meta["sorted"]:
+            lo, hi = bisect.bisect_left(dates, lo_day), bisect.bisect_right(dates, hi_day)
+            pick   = slice(lo, hi)
+            return {c: self._read(c, meta["rows"])[pick] for c in ("date", "run_at", *names)}
+        # Out-of-order dates in the log (hand edits) — plain filter instead of bisect
+        keep = [i for i, d in enumerate(dates) if lo_day <= d <= hi_day]
+        out  = {}
+        for column in ("date", "run_at", *names):
+            col         = self._read(column, meta["rows"])
+            out[column] = array(_COLUMNS[column][0], (col[i] for i in keep))
+        return out
+
+    def aggregate(self, field: str, start=None, end=None) -> dict:
+        """count / sum / mean / min / max / first / last / change of one field over a date range."""
+        values = self.columns((field,), start, end)[field]
+        if self._meta()["missing"][field]:
+            values = array("d", (v for v in values if v == v))    # drop NaN (field not recorded)
+        if not values:
+            return {"field": field, "count": 0}
+        total = math.fsum(values)
+        return {
+            "field":  field,
+            "count":  len(values),
+            "sum":    total,
+            "mean":   total / len(values),
+            "min":    min(values),
+            "max":    max(values),
+            "first":  values[0],
+            "last":   values[-1],
+            "change": values[-1] - values[0],
+        }
+
+    def daily_last(self, field: str, start=None, end=None) -> list:
+        """[(date, value)] — the last run of every day (several scripts append per day)."""
+        cols = self.columns((field,), start, end)
+        out  = {}
+        for day, value in zip(cols["date"], cols[field]):
+            if value == value:
+                out[day] = value
+        return [(date.fromordinal(d).isoformat(), v) for d, v in sorted(out.items())]
+
+
+# Shared instance for the default log
+stats_series = StatsSeries()
+
+
+# ─────────────────────────────────────────────
+# CLI
+# ─────────────────────────────────────────────
+
+def main():
+    parser = argparse.ArgumentParser(description="Aggregate the columnar star statistics.")
+    parser.add_argument("fields", nargs="*", default=list(FIELDS), help="fields (default: all)")
+    parser.add_argument("--from", dest="start", help="first day (YYYY-MM-DD)")
+    parser.add_argument("--to", dest="end", help="last day (YYYY-MM-DD)")
+    args = parser.parse_args()
+
+    unknown = [f for f in args.fields if f not in FIELDS]
+    if unknown:
+        parser.error(f"unknown field(s): {', '.join(unknown)} — known: {', '.join(FIELDS)}")
+
+    meta = stats_series.sync()
+    print(f"{meta['rows']} runs in {stats_series.folder}/")
+    print(f"  {'field':<20} {'runs':>5} {'first':>9} {'last':>9} {'change':>8} {'min':>9} {'max':>9} {'mean':>10}")
+    for field in args.fields:
+        a = stats_series.aggregate(field, args.start, args.end)
+        if not a["count"]:
+            print(f"  {field:<20} {0:>5}")
+            continue
+        print(f"  {field:<20} {a['count']:>5} {a['first']:>9g} {a['last']:>9g} {a['change']:>+8g} "
+              f"{a['min']:>9g} {a['max']:>9g} {a['mean']:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+# =============================================================================
+# codey_shard.py
+# Sharded fleet runs — split batch / org users across several runners.
+#
+# Two ways, can be combined:
+#
+#   CODEY_SHARD=i/N        static split by rendezvous (consistent) hash.
+#                          Runner i (0-based) takes the users that hash to it.
+#                          Going from N to N+1 runners only moves ~1/N users.
+#
+#   CODEY_LEASE_DIR=path   dynamic split through lease files in a shared
+#                          directory: <owner>.lease = {worker, expires_at}.
+#                          Created with O_EXCL, so exactly one runner wins.
+#                          Leases are renewed while the user runs and deleted
+#                          when done. A crashed runner's leases expire after
+#                          CODEY_LEASE_TTL seconds and are taken over.
+#
+# Double-processing is also checked against the state itself: after winning a
+# lease the runner re-reads last_update — somebody else may have finished the
+# user in the meantime (the state dir must be shared too).
+#
+# With both set, a runner also adopts users of other shards once they are
+# CODEY_SHARD_ADOPT_HOURS stale (their runner is probably dead) — under a lease.
+#
+# Place in: .codey/scripts/codey_shard.py
+# =============================================================================
+# Licensed under Apache 2.0 & ESOL v1.1
+# https://github.com/ESOL-License/ESOL/
+# =============================================================================
+
+import hashlib
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+from pathlib import Path
+
+# ─────────────────────────────────────────────
+# CONFIG
+# ─────────────────────────────────────────────
+SHARD             = os.environ.get("CODEY_SHARD")            # "i/N", unset = no static split
+LEASE_DIR         = os.environ.get("CODEY_LEASE_DIR")        # unset = no leases
+LEASE_TTL         = float(os.environ.get("CODEY_LEASE_TTL", 900))
+SHARD_ADOPT_HOURS = float(os.environ.get("CODEY_SHARD_ADOPT_HOURS", 48))
+WORKER_ID         = os.environ.get("CODEY_WORKER_ID") or f"{socket.gethostname()}-{os.getpid()}"
+
+
+def parse_shard(value: str) -> tuple:
+    """'2/5' → (2, 5). None if unset, ValueError if malformed."""
+    if not value:
+        return None
+    index, count = (int(x) for x in value.split("/"))
+    if count < 1 or not 0 <= index < count:
+        raise ValueError(f"CODEY_SHARD={value!r} — expected i/N with 0 <= i < N")
+    return index, count
+
+
+# ─────────────────────────────────────────────
+# CONSISTENT HASH
+# ─────────────────────────────────────────────
+
+def shard_of(owner: str, count: int) -> int:
+    """Rendezvous hashing: the shard with the highest hash(owner, shard) wins."""
+    def weight(shard):
+        return hashlib.sha1(f"{owner.lower()}:{shard}".encode()).digest()
+    return max(range(count), key=weight)
+
+
+def shard_filter():
+    """accept(owner, hours_since) for plan_fleet, or None when not sharded."""
+    shard = parse_shard(SHARD)
+    if shard is None:
+        return None
+    index, count = shard
+
+    def accept(owner: str, hours: float) -> bool:
+        if shard_of(owner, count) == index:
+            return True
+        # Adopt other shards' users only when a lease protects against double runs
+        return bool(LEASE_DIR) and hours >= SHARD_ADOPT_HOURS
+    return accept
+
+
+# ─────────────────────────────────────────────
+# LEASES
+# ─────────────────────────────────────────────
+
+class LeaseStore:
+    """Lease files in a shared directory. Thread-safe within one runner."""
+
+    def __init__(self, directory, worker_id: str = WORKER_ID, ttl: float = LEASE_TTL):
+        self.directory = Path(directory)
+        self.worker_id = worker_id
+        self.ttl       = ttl
+        self._lock     = threading.Lock()
+        self._held     = set()
+        self._stop     = threading.Event()
+        self._thread   = None
+        self.stats     = {"claimed": 0, "taken_over": 0, "lost": 0}
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, owner: str) -> Path:
+        return self.directory / f"{owner.lower()}.lease"
+
+    def _payload(self) -> bytes:
+        return json.dumps({"worker": self.worker_id, "expires_at": time.time() + self.ttl}).encode()
+
+    def _read(self, path: Path) -> dict:
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def claim(self, owner: str) -> bool:
+        """True if this worker now holds the lease for owner."""
+        path = self._path(owner)
+        for _ in range(2):
+            try:
+                fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+            except FileExistsError:
+                lease = self._read(path)
+                if lease is None:
+                    # Being written right now — or left empty by a runner that died mid-claim
+                    try:
+                        age = time.time() - path.stat().st_mtime
+                    except FileNotFoundError:
+                        continue
+                    if age < self.ttl or not self._take_over(path):
+                        return False
+                    continue
+                if lease.get("worker") == self.worker_id:
+                    return True
+                if lease.get("expires_at", 0) > time.time() or not self._take_over(path):
+                    return False
+                continue                    # expired lease removed → create ours
+            with os.fdopen(fd, "wb") as f:
+                f.write(self._payload())
+            with self._lock:
+                self._held.add(owner.lower())
+                self.stats["claimed"] += 1
+            return True
+        return False
+
+    def _take_over(self, path: Path) -> bool:
+        """Removes an expired lease. Rename is atomic — only one runner gets it."""
+        grabbed = path.with_name(f"{path.name}.{uuid.uuid4().hex}.stale")
+        try:
+            os.rename(path, grabbed)
+        except FileNotFoundError:
+            return True                     # already gone
+        lease = self._read(grabbed)
+        if lease and lease.get("expires_at", 0) > time.time():
+            # Raced with a fresh claim — put it back if the slot is still free
+            try:
+                os.link(grabbed, path)
+            except OSError:
+                pass
+            grabbed.unlink(missing_ok=True)
+            return False
+        grabbed.unlink(missing_ok=True)
+        with self._lock:
+            self.stats["taken_over"] += 1
+        print(f"🔓 Lease of {lease.get('worker') if lease else '?'} expired — taking over {path.stem}")
+        return True
+
+    def release(self, owner: str):
+        path = self._path(owner)
+        with self._lock:
+            self._held.discard(owner.lower())
+        lease = self._read(path)
+        if lease and lease.get("worker") == self.worker_id:
+            path.unlink(missing_ok=True)
+
+    def renew(self):
+        """Pushes expires_at of all held leases forward (atomic replace)."""
+        with self._lock:
+            held = list(self._held)
+        for owner in held:
+            path  = self._path(owner)
+            lease = self._read(path)
+            if not lease or lease.get("worker") != self.worker_id:
+                with self._lock:
+                    self._held.discard(owner)
+                    self.stats["lost"] += 1
+                print(f"⚠️  Lease for {owner} lost to {lease.get('worker') if lease else 'nobody'}")
+                continue
+            tmp = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+            tmp.write_bytes(self._payload())
+            os.replace(tmp, path)
+
+    # ── heartbeat ───────────────────────────
+    def __enter__(self):
+        def beat():
+            while not self._stop.wait(self.ttl / 3):
+                self.renew()
+        self._thread = threading.Thread(target=beat, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        with self._lock:
+            held = list(self._held)
+        for owner in held:
+            self.release(owner)
+
+    def print_summary(self):
+        s = self.stats
+        print(f"🔐 Leases ({self.worker_id}): {s['claimed']} claimed, "
+              f"{s['taken_over']} taken over from dead runners, {s['lost']} lost")
+
+
+def lease_store():
+    """LeaseStore for CODEY_LEASE_DIR, or None when leases are off."""
+    return LeaseStore(LEASE_DIR) if LEASE_DIR else None
+
+
+def leased(run_user, leases: LeaseStore, is_due, read_state, budget=None, cost_of=lambda owner: 0):
+    """
+    Wraps run_user(owner, state_path, svg_path) for lease mode:
+      over budget       → 'deferred'
+      lease held by another runner → 'elsewhere'
+      done meanwhile (not due anymore) → 'not due'
+    The budget is spent as users are claimed, so runners sharing a queue
+    don't all plan for the same users.
+    """
+    lock  = threading.Lock()
+    spent = [0.0]
+
+    def refund(cost):
+        with lock:
+            spent[0] -= cost
+
+    def run(owner, state_path, svg_path):
+        cost = cost_of(owner)
+        with lock:
+            if budget is not None and spent[0] + cost > budget:
+                return "deferred"
+            spent[0] += cost                # reserved — refunded if we don't run
+        if not leases.claim(owner):
+            refund(cost)
+            return "elsewhere"
+        try:
+            due, _ = is_due(read_state(owner, state_path))
+            if not due:
+                refund(cost)
+                return "not due"
+            return run_user(owner, state_path, svg_path)
+        finally:
+            leases.release(owner)
+    return run
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# =============================================================================
+# codey_singleflight.py
+# Request coalescing ("single-flight") for duplicate API calls within a run.
+#
+# Key = (method, url, params, body, accept). For one key:
+#   - concurrent callers wait for the one call already in flight
+#   - later callers get the finished result (no second request)
+#   - failures are shared with the waiters only, never kept — a retry later
+#     in the run hits the network again
+#
+# Results are shared objects — treat them as read-only.
+#
+# Lifetime: finished results live as long as their scope. A single-user run
+# has no scope — the process is the run. Batch / org / fleet runs wrap every
+# user in singleflight.scope() (codey_batch.py), so one user's pages, repo
+# lists and /languages are dropped when that user is done and never served
+# to the next one. Calls meant for everybody (org repos) pass shared=True
+# and go into the process-wide table instead.
+#
+# Place in: .codey/scripts/codey_singleflight.py
+# =============================================================================
+# Licensed under Apache 2.0 & ESOL v1.1
+# https://github.com/ESOL-License/ESOL/
+# =============================================================================
+
+import contextvars
+import json
+import threading
+from contextlib import contextmanager
+
+
+def request_key(method: str, url: str, params: dict = None, body=None, accept: str = None) -> tuple:
+    """Hashable identity of a request. Param order does not matter."""
+    return (
+        method.upper(),
+        url,
+        tuple(sorted((str(k), str(v)) for k, v in (params or {}).items())),
+        json.dumps(body, sort_keys=True) if body is not None else None,
+        accept,
+    )
+
+
+class _Call:
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self):
+        self.event  = threading.Event()
+        self.result = None
+        self.error  = None
+
+
+class SingleFlight:
+    """In-process coalescing cache. Thread-safe."""
+
+    def __init__(self):
+        self._lock  = threading.Lock()
+        self._calls = {}                    # process-wide: no scope active, or shared=True
+        self._scope = contextvars.ContextVar(f"codey_singleflight_{id(self)}", default=None)
+        self.stats  = {"calls": 0, "coalesced": 0, "repeated": 0}
+
+    @contextmanager
+    def scope(self):
+        """
+        Own result table for the with-block (one user of a batch run), dropped
+        at the end. Follows the caller into ScopedThreadPool workers.
+        """
+        token = self._scope.set({})
+        try:
+            yield
+        finally:
+            self._scope.reset(token)
+
+    def _table(self, shared: bool) -> dict:
+        scoped = self._scope.get()
+        return self._calls if shared or scoped is None else scoped
+
+    def do(self, key, fn, keep=lambda result: True, shared: bool = False):
+        """
+        Runs fn() once per key and hands the result to every caller.
+        keep(result) decides whether a finished result may be reused later
+        (e.g. only successful responses). shared=True coalesces across scopes.
+        """
+        calls = self._table(shared)
+        with self._lock:
+            call = calls.get(key)
+            if call is None:
+                call = calls[key] = _Call()
+                leader = True
+                self.stats["calls"] += 1
+            else:
+                leader = False
+                self.stats["repeated" if call.event.is_set() else "coalesced"] += 1
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            with self._lock:
+                calls.pop(key, None)
+            raise
+        finally:
+            call.event.set()
+
+        if not keep(call.result):
+            with self._lock:
+                calls.pop(key, None)
+        return call.result
+
+    def saved(self) -> int:
+        return self.stats["coalesced"] + self.stats["repeated"]
+
+    def print_summary(self):
+        s = self.stats
+        if self.saved():
+            print(f"🔗 Single-flight: {self.saved()} calls saved "
+                  f"({s['coalesced']} joined in-flight, {s['repeated']} repeated) of {s['calls'] + self.saved()}")
+
+
+# Shared process-wide instance
+singleflight = SingleFlight()
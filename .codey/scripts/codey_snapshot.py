@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# =============================================================================
+# codey_snapshot.py
+# Shared raw-data snapshot — collect once per day, read everywhere.
+#
+# update_codey.py, codey_star_report.py and update_stats.py used to list the
+# same repos + stars for the same user, each on its own. Now one collection
+# stage (update_codey.py) writes a snapshot and the report stages read it:
+#
+#   .codey/snapshot/<owner>/<YYYYMMDDTHHMMSSZ>.json   timestamped, last N kept
+#   .codey/snapshot/<owner>/latest.json               copy of the newest one
+#
+# Content (SNAPSHOT_VERSION 1):
+#   user, repos (own), forks, self_starred, events, languages (bytes, own repos)
+# Repos are stored in REST shape — GraphQL collections are mapped before saving.
+#
+# A snapshot is used if its version matches and it is younger than
+# CODEY_SNAPSHOT_MAX_AGE_HOURS — otherwise the reader fetches on its own.
+# That age is for the report scripts. The scoring run in update_codey.py
+# collects fresh data and only reuses a snapshot that a --collect step wrote
+# minutes earlier (CODEY_SCORE_SNAPSHOT_MINUTES).
+#
+# Place in: .codey/scripts/codey_snapshot.py
+# =============================================================================
+# Licensed under Apache 2.0 & ESOL v1.1
+# https://github.com/ESOL-License/ESOL/
+# =============================================================================
+
+import json
+import os
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from codey_clock import now as clock_now
+from codey_atomic import atomic_write
+
+# ─────────────────────────────────────────────
+# CONFIG
+# ─────────────────────────────────────────────
+SNAPSHOT_VERSION       = 1
+SNAPSHOT_DIR           = Path(os.environ.get("CODEY_SNAPSHOT_DIR", ".codey/snapshot"))
+SNAPSHOT_MAX_AGE_HOURS = float(os.environ.get("CODEY_SNAPSHOT_MAX_AGE_HOURS", 20))
+SNAPSHOT_KEEP          = int(os.environ.get("CODEY_SNAPSHOT_KEEP", 7))
+
+
+def _owner_dir(owner: str) -> Path:
+    return SNAPSHOT_DIR / owner.lower()
+
+
+# ─────────────────────────────────────────────
+# WRITE
+# ─────────────────────────────────────────────
+
+def write_snapshot(owner: str, backend: str, user: dict, repos_list: list,
+                   self_starred: set, events: list, languages: dict) -> dict:
+    """Writes a new snapshot (+ latest.json), prunes old ones. Returns the snapshot."""
+    collected_at = clock_now(timezone.utc).replace(microsecond=0)
+    snapshot = {
+        "version":      SNAPSHOT_VERSION,
+        "owner":        owner,
+        "collected_at": collected_at.isoformat(),
+        "backend":      backend,
+        "user":         user,
+        "repos":        [r for r in repos_list if not r.get("fork")],
+        "forks":        [r for r in repos_list if r.get("fork")],
+        "self_starred": sorted(self_starred),
+        "events":       events,
+        "languages":    dict(languages),
+    }
+
+    if not user:
+        print("⚠️  Collection incomplete (no user data) — snapshot not saved")
+        return snapshot
+
+    folder = _owner_dir(owner)
+    folder.mkdir(parents=True, exist_ok=True)
+    text = json.dumps(snapshot)
+    atomic_write(folder / f"{collected_at.strftime('%Y%m%dT%H%M%SZ')}.json", text)
+    atomic_write(folder / "latest.json", text)
+
+    dated = sorted(p for p in folder.glob("*.json") if p.name != "latest.json")
+    for old in dated[:-SNAPSHOT_KEEP] if SNAPSHOT_KEEP > 0 else []:
+        old.unlink(missing_ok=True)
+
+    print(f"📦 Snapshot written: {len(snapshot['repos'])} repos, {len(snapshot['forks'])} forks, "
+          f"{len(events)} events ({backend})")
+    return snapshot
+
+
+# ─────────────────────────────────────────────
+# READ
+# ─────────────────────────────────────────────
+
+def load_snapshot(owner: str, max_age_hours: float = None) -> dict:
+    """Newest snapshot of owner if usable (same version, fresh enough), else None."""
+    max_age_hours = SNAPSHOT_MAX_AGE_HOURS if max_age_hours is None else max_age_hours
+    try:
+        snapshot = json.loads((_owner_dir(owner) / "latest.json").read_text(encoding="utf-8"))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+    if snapshot.get("version") != SNAPSHOT_VERSION:
+        print(f"📦 Snapshot version {snapshot.get('version')} ≠ {SNAPSHOT_VERSION} — ignored")
+        return None
+    collected_at = datetime.fromisoformat(snapshot["collected_at"])
+    age          = clock_now(timezone.utc) - collected_at
+    if age > timedelta(hours=max_age_hours):
+        print(f"📦 Snapshot is {age.total_seconds() / 3600:.1f}h old (max {max_age_hours:g}h) — ignored")
+        return None
+
+    print(f"📦 Using snapshot from {snapshot['collected_at']} ({snapshot.get('backend', '?')})")
+    return snapshot
+
+
+def graphql_nodes(snapshot: dict, is_fork: bool) -> list:
+    """Repos of a snapshot in the GraphQL node shape the star-report scripts use."""
+    return [{
+        "name":           r["name"],
+        "stargazerCount": r.get("stargazers_count", 0),
+        "isArchived":     r.get("archived", False),
+        "isDisabled":     r.get("disabled", False),
+        "isLocked":       False,   # not exposed by the REST repo list
+        "owner":          {"login": r.get("owner", {}).get("login", snapshot["owner"])},
+    } for r in snapshot["forks" if is_fork else "repos"]]
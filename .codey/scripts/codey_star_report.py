@@ -12,21 +12,28 @@
 # https://github.com/ESOL-License/ESOL/
 # =============================================================================
 
-import requests
 import os
-import json
 from datetime import datetime, timezone
 from pathlib import Path
 
+from codey_http import get_session, HTTP_TIMEOUT, GRAPHQL_URL
+from codey_clock import now as clock_now
+from codey_atomic import atomic_write
+from codey_ratelimit import rate_limiter
+from codey_retry import request_with_retry, endpoint_key, retry_stats
+from codey_tokens import token_pool, pooled_request
+from codey_starred import sync_self_stars, StarredFetchError
+from codey_snapshot import load_snapshot, graphql_nodes
+from codey_stats_log import stats_log
+from codey_series import stats_series
+
 # ─────────────────────────────────────────────
 # CONFIG
 # ─────────────────────────────────────────────
 REPO     = os.environ.get("GITHUB_REPOSITORY", "/")
 USERNAME = REPO.split("/")[0]
 REPONAME = REPO.split("/")[1] if "/" in REPO else "Codey"
-TOKEN    = os.environ.get("GIT_TOKEN") or os.environ.get("GITHUB_TOKEN")
-HEADERS  = {"Authorization": f"Bearer {TOKEN}"}
-JSONL    = Path(".codey/stats_history.jsonl")
+TOKEN    = token_pool.primary   # CODEY_TOKENS / GIT_TOKEN / GITHUB_TOKEN
 REPORT   = Path("CODEY_STAR_REPORT.md")
 
 if not TOKEN:
@@ -38,40 +45,52 @@ if not TOKEN:
 # FETCH
 # ─────────────────────────────────────────────
 
-def fetch_starred_own() -> set:
-    """Returns set of repo names the user has starred themselves (self-stars)."""
-    starred = set()
-    cursor  = None
-    while True:
-        after = f', after: "{cursor}"' if cursor else ""
-        query = """{ user(login: "%s") { starredRepositories(
-            first: 100%s) {
-            nodes { name owner { login } }
-            pageInfo { hasNextPage endCursor }
-        }}}""" % (USERNAME, after)
-
-        r = requests.post(
-            "https://api.github.com/graphql",
-            json={"query": query},
-            headers=HEADERS
-        )
-        r.raise_for_status()
-        data = r.json()
-
-        if "errors" in data:
-            print(f"API error: {data['errors']}")
-            exit(1)
-
-        page = data["data"]["user"]["starredRepositories"]
-        for node in page["nodes"]:
-            if node["owner"]["login"] == USERNAME:
-                starred.add(node["name"])
-
-        if not page["pageInfo"]["hasNextPage"]:
-            break
-        cursor = page["pageInfo"]["endCursor"]
-
-    return starred
+def fetch_starred_own(repos: list = None) -> set:
+    """Returns set of repo names the user has starred themselves (self-stars).
+    Incremental: newest stars first, stops at last run's newest star (codey_starred.py).
+    repos = own + fork repo nodes, enables the unstar / delete check.
+    """
+    def iter_pages():
+        cursor = None
+        while True:
+            after = f', after: "{cursor}"' if cursor else ""
+            query = """{ user(login: "%s") { starredRepositories(
+                first: 100, orderBy: {field: STARRED_AT, direction: DESC}%s) {
+                edges { starredAt node { name owner { login } } }
+                pageInfo { hasNextPage endCursor }
+            }}}""" % (USERNAME, after)
+
+            if not rate_limiter.before_request("graphql"):
+                raise StarredFetchError("rate limit")
+            r, err = request_with_retry(
+                lambda: pooled_request(lambda auth: get_session().post(
+                    GRAPHQL_URL,
+                    json={"query": query},
+                    headers=auth,
+                    timeout=HTTP_TIMEOUT
+                ), "graphql"),
+                endpoint_key("POST", GRAPHQL_URL)
+            )
+            if r is None:
+                raise StarredFetchError(err)
+            r.raise_for_status()
+            data = r.json()
+
+            if "errors" in data:
+                print(f"API error: {data['errors']}")
+                exit(1)
+
+            page = data["data"]["user"]["starredRepositories"]
+            yield [(e["starredAt"], e["node"]["owner"]["login"], e["node"]["name"]) for e in page["edges"]]
+
+            if not page["pageInfo"]["hasNextPage"]:
+                return
+            cursor = page["pageInfo"]["endCursor"]
+
+    own_star_counts = None
+    if repos is not None:
+        own_star_counts = {r["name"]: r["stargazerCount"] for r in repos}
+    return sync_self_stars(USERNAME, iter_pages, own_star_counts)
 
 
 def fetch_repos(is_fork: bool) -> list:
@@ -86,11 +105,20 @@ def fetch_repos(is_fork: bool) -> list:
             pageInfo { hasNextPage endCursor }
         }}}""" % (USERNAME, str(is_fork).lower(), after)
 
-        r = requests.post(
-            "https://api.github.com/graphql",
-            json={"query": query},
-            headers=HEADERS
+        if not rate_limiter.before_request("graphql"):
+            exit(1)
+        r, err = request_with_retry(
+            lambda: pooled_request(lambda auth: get_session().post(
+                GRAPHQL_URL,
+                json={"query": query},
+                headers=auth,
+                timeout=HTTP_TIMEOUT
+            ), "graphql"),
+            endpoint_key("POST", GRAPHQL_URL)
         )
+        if r is None:
+            print(f"Network error: {err}")
+            exit(1)
         r.raise_for_status()
         data = r.json()
 
@@ -202,18 +230,19 @@ def write_report(own: dict, fork: dict, self_starred_count: int, now: str):
             lines.append(f"| {r['name']} | {r['stargazerCount']} |")
         return "\n".join(lines) + "\n"
 
-    # ── previous run delta ──────────────────
+    # ── previous day delta ──────────────────
+    # Index lookup instead of reading the whole history (codey_stats_log.py).
+    # Compares against the last run before today, not the previous line — a
+    # second run on the same day doesn't show +0. The label names that run's date.
     delta_str = ""
-    if JSONL.exists():
-        try:
-            lines_raw = JSONL.read_text(encoding="utf-8").strip().splitlines()
-            if len(lines_raw) >= 2:
-                prev = json.loads(lines_raw[-1])
-                diff = grand_total - prev.get("grand_total_stars", grand_total)
-                sign = "+" if diff >= 0 else ""
-                delta_str = f" ({sign}{diff} since yesterday)"
-        except Exception:
-            pass
+    try:
+        prev = stats_log.days_ago(1, datetime.strptime(now[:10], "%Y-%m-%d").date())
+        if prev:
+            diff = grand_total - prev.get("grand_total_stars", grand_total)
+            sign = "+" if diff >= 0 else ""
+            delta_str = f" ({sign}{diff} since {prev.get('date', '?')[:10]})"
+    except Exception:
+        pass
 
     lines = []
 
@@ -281,7 +310,7 @@ def write_report(own: dict, fork: dict, self_starred_count: int, now: str):
     lines.append("> Stars are just the surface.")
     lines.append(f"> [Meet my Codey](https://github.com/{USERNAME}/{REPONAME}) — it tracks commits, streaks, code quality and brutally judges my dev life. Daily.\n")
 
-    REPORT.write_text("\n".join(lines), encoding="utf-8")
+    atomic_write(REPORT, "\n".join(lines), backup=True)
     print("CODEY_STAR_REPORT.md written.")
 
 
@@ -290,7 +319,6 @@ def write_report(own: dict, fork: dict, self_starred_count: int, now: str):
 # ─────────────────────────────────────────────
 
 def append_jsonl(own: dict, fork: dict, now: str):
-    JSONL.parent.mkdir(parents=True, exist_ok=True)
     record = {
         "date":               now[:10],
         "run_utc":            now,
@@ -310,8 +338,8 @@ def append_jsonl(own: dict, fork: dict, now: str):
             for r in own["active_repos"][:10]
         ],
     }
-    with open(JSONL, "a", encoding="utf-8") as f:
-        f.write(json.dumps(record) + "\n")
+    stats_log.append(record)   # indexed append (codey_stats_log.py)
+    stats_series.sync()        # numeric columns follow the log (codey_series.py)
     print("stats_history.jsonl updated.")
 
 
@@ -320,20 +348,33 @@ def append_jsonl(own: dict, fork: dict, now: str):
 # ─────────────────────────────────────────────
 
 if __name__ == "__main__":
-    now = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
+    now = clock_now(timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
+
+    # Today's snapshot from update_codey.py → no API calls at all
+    snapshot = load_snapshot(USERNAME)
+    if snapshot:
+        own_raw      = graphql_nodes(snapshot, False)
+        fork_raw     = graphql_nodes(snapshot, True)
+        self_starred = set(snapshot["self_starred"])
+    else:
+        print(f"Fetching own repos...")
+        own_raw  = fetch_repos(False)
 
-    print(f"Fetching self-starred repos...")
-    self_starred = fetch_starred_own()
+        print(f"Fetching forked repos...")
+        fork_raw = fetch_repos(True)
 
-    print(f"Fetching own repos...")
-    own  = process(fetch_repos(False), self_starred)
+        # Repos first: their star counts tell whether the self-star cache is still valid
+        print(f"Fetching self-starred repos...")
+        self_starred = fetch_starred_own(own_raw + fork_raw)
 
-    print(f"Fetching forked repos...")
-    fork = process(fetch_repos(True), self_starred)
+    own  = process(own_raw, self_starred)
+    fork = process(fork_raw, self_starred)
 
     print_bash_report(own, fork, len(self_starred), now)
 
     write_report(own, fork, len(self_starred), now)
     append_jsonl(own, fork, now)
 
+    token_pool.print_summary()
+    retry_stats.print_summary()
     print("Done.")
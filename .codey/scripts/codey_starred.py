@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# =============================================================================
+# codey_starred.py
+# Incremental self-star detection.
+#
+# Old way: page through EVERYTHING the user ever starred (30+ requests for
+# heavy starrers) just to find the handful of own repos they starred.
+#
+# New way: the starred list is read newest-starred first and we stop at the
+# newest star of the last run. The self-star set lives in
+# .codey/starred/<owner>.json. A full walk only happens when
+#   - there is no cache yet,
+#   - CODEY_STARRED_FULL_SYNC_DAYS passed (default 7),
+#   - a self-starred repo lost stars or disappeared (unstar / delete / rename).
+# So the cost follows the own repos that changed — not the starred history.
+#
+# Used by update_codey.py (REST) and codey_star_report.py (GraphQL):
+# both only provide a page iterator, the stop logic lives here.
+#
+# Place in: .codey/scripts/codey_starred.py
+# =============================================================================
+# Licensed under Apache 2.0 & ESOL v1.1
+# https://github.com/ESOL-License/ESOL/
+# =============================================================================
+
+import json
+import os
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from codey_clock import now as clock_now
+from codey_atomic import atomic_write_json
+
+# ─────────────────────────────────────────────
+# CONFIG
+# ─────────────────────────────────────────────
+STARRED_DIR            = Path(os.environ.get("CODEY_STARRED_DIR", ".codey/starred"))
+STARRED_FULL_SYNC_DAYS = int(os.environ.get("CODEY_STARRED_FULL_SYNC_DAYS", 7))
+
+
+class StarredFetchError(Exception):
+    """Raised by a page iterator when a page could not be fetched."""
+
+
+def _parse(ts):
+    return datetime.fromisoformat(ts.replace("Z", "+00:00")) if ts else None
+
+
+def load_starred_cache(owner: str) -> dict:
+    try:
+        return json.loads((STARRED_DIR / f"{owner.lower()}.json").read_text(encoding="utf-8"))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def save_starred_cache(owner: str, cache: dict):
+    STARRED_DIR.mkdir(parents=True, exist_ok=True)
+    atomic_write_json(STARRED_DIR / f"{owner.lower()}.json", cache, durable=False)
+
+
+def needs_full_sync(cache: dict, own_star_counts: dict = None) -> str:
+    """Returns the reason for a full walk, or "" if incremental is safe."""
+    if not cache.get("newest_starred_at"):
+        return "no cache"
+    last_full = _parse(cache.get("last_full_sync"))
+    if not last_full or clock_now(timezone.utc) - last_full >= timedelta(days=STARRED_FULL_SYNC_DAYS):
+        return "periodic resync"
+    if own_star_counts is not None:
+        old_counts = cache.get("star_counts", {})
+        for name in cache.get("self_starred", []):
+            if name not in own_star_counts:
+                return f"{name} gone"
+            if own_star_counts[name] < old_counts.get(name, 0):
+                return f"{name} lost stars"
+    return ""
+
+
+# ─────────────────────────────────────────────
+# SYNC
+# ─────────────────────────────────────────────
+
+def sync_self_stars(owner: str, iter_pages, own_star_counts: dict = None) -> set:
+    """
+    iter_pages() → iterator over pages, newest star first. Each page is a list
+    of (starred_at_iso, repo_owner_login, repo_name). Must be lazy: we stop
+    pulling pages as soon as we are past the watermark.
+
+    own_star_counts = {repo_name: stargazers} for all repos of owner (optional,
+    enables the unstar/delete check). Returns the set of self-starred repo names.
+    """
+    cache  = load_starred_cache(owner)
+    reason = needs_full_sync(cache, own_star_counts)
+    full   = bool(reason)
+
+    watermark = None if full else _parse(cache["newest_starred_at"])
+    found     = set() if full else set(cache.get("self_starred", []))
+    newest    = None if full else cache.get("newest_starred_at")
+    pages     = 0
+
+    try:
+        for page in iter_pages():
+            pages += 1
+            crossed = False
+            for starred_at, login, name in page:
+                ts = _parse(starred_at)
+                if watermark and ts and ts <= watermark:
+                    crossed = True
+                    break
+                if newest is None or (ts and ts > _parse(newest)):
+                    newest = starred_at
+                if login.lower() == owner.lower():
+                    found.add(name)
+            if crossed:
+                break
+    except StarredFetchError as e:
+        # Incomplete walk → don't move the watermark, best effort result only
+        print(f"⚠️  Self-stars: fetch failed after {pages} page(s) ({e}) — cache not updated")
+        return found | set(cache.get("self_starred", []))
+
+    cache["self_starred"]      = sorted(found)
+    cache["newest_starred_at"] = newest
+    if own_star_counts is not None:
+        cache["star_counts"] = {n: own_star_counts.get(n, 0) for n in found}
+    if full:
+        cache["last_full_sync"] = clock_now(timezone.utc).isoformat()
+    save_starred_cache(owner, cache)
+
+    mode = f"full ({reason})" if full else "incremental"
+    print(f"✓ Self-stars: {len(found)} — {mode}, {pages} page(s)")
+    return found
@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+# =============================================================================
+# codey_state.py
+# Pluggable state store — where codey.json lives.
+#
+#   CODEY_STATE_BACKEND=json     (default) one codey.json per user, as always
+#   CODEY_STATE_BACKEND=sqlite   one database for every user: CODEY_STATE_DB
+#
+# SQLite layout:
+#   codey_state    owner → current state (JSON, without history), last_update
+#   codey_history  (owner, timestamp) → one history entry — legacy only, see below
+#
+# History has one source of truth: the per-user log in .codey/history
+# (codey_history.py). Both backends read state['history'] through from it
+# (the last HISTORY_WINDOW runs), and the SQLite store stops writing its
+# history table for a user once that log exists. The table only still
+# serves users whose log has not been started yet.
+#
+# load() hands back the familiar dict, so update_codey.py and the themes
+# don't notice the difference.
+# Users without a row are imported from their codey.json on first load.
+#
+# Writes are batched: save() buffers, flush() writes everything pending in
+# ONE transaction (automatically every CODEY_STATE_BATCH saves, at the end of
+# a run and at exit). load() sees pending saves.
+#
+# codey.json stays the export format: with CODEY_STATE_EXPORT=true (default)
+# every save also writes the JSON file, so workflows that commit codey.json
+# keep working. Big fleets can switch it off and export on demand:
+#
+#   python .codey/scripts/codey_state.py export <owner> [codey.json]
+#   python .codey/scripts/codey_state.py list
+#
+# Place in: .codey/scripts/codey_state.py
+# =============================================================================
+# Licensed under Apache 2.0 & ESOL v1.1
+# https://github.com/ESOL-License/ESOL/
+# =============================================================================
+
+import argparse
+import atexit
+import copy
+import json
+import os
+import sqlite3
+import threading
+from datetime import timezone
+from pathlib import Path
+
+from codey_atomic import atomic_write_json, read_latest_backup
+from codey_clock import now as clock_now
+from codey_history import HISTORY_WINDOW, HistoryLog   # history source of truth + window
+
+# ─────────────────────────────────────────────
+# CONFIG
+# ─────────────────────────────────────────────
+STATE_BACKEND    = os.environ.get("CODEY_STATE_BACKEND", "json").lower()
+STATE_DB         = Path(os.environ.get("CODEY_STATE_DB", ".codey/state.db"))
+STATE_BATCH      = int(os.environ.get("CODEY_STATE_BATCH", 20))
+STATE_EXPORT     = os.environ.get("CODEY_STATE_EXPORT", "true").lower() not in ("0", "false", "no")
+SCHEMA_VERSION   = 1
+
+
+def _history_log(owner: str):
+    """owner's .codey/history log if it was started, else None."""
+    log = HistoryLog(owner) if owner else None
+    return log if log is not None and log.exists() else None
+
+
+def _read_through(owner: str, state: dict) -> dict:
+    """Replaces state['history'] with the newest runs of the history log (if there is one)."""
+    log = _history_log(owner)
+    if state is not None and log is not None:
+        state["history"] = log.recent(HISTORY_WINDOW)
+    return state
+
+
+# ─────────────────────────────────────────────
+# JSON (default)
+# ─────────────────────────────────────────────
+
+class JsonStateStore:
+    """One JSON file per user — the path is the key."""
+
+    name = "json"
+
+    def load(self, owner: str, path: str) -> dict:
+        """State dict, or None if the file is missing. A corrupt file falls back to its newest backup."""
+        try:
+            with open(path, "r") as f:
+                return _read_through(owner, json.load(f))
+        except FileNotFoundError:
+            return None
+        except json.JSONDecodeError:
+            backup, text = read_latest_backup(path)
+            if backup is None:
+                return None
+            print(f"⚠️  {path} is corrupt — restored from {backup}")
+            return _read_through(owner, json.loads(text))
+
+    def save(self, owner: str, state: dict, path: str):
+        atomic_write_json(path, state, backup=True, indent=2)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+    def print_summary(self):
+        pass
+
+
+# ─────────────────────────────────────────────
+# SQLITE
+# ─────────────────────────────────────────────
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS codey_state (
+    owner       TEXT PRIMARY KEY,
+    state       TEXT NOT NULL,
+    last_update TEXT,
+    saved_at    TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS codey_history (
+    owner       TEXT NOT NULL,
+    timestamp   TEXT NOT NULL,
+    entry       TEXT NOT NULL,
+    PRIMARY KEY (owner, timestamp)
+) WITHOUT ROWID;
+"""
+
+
+class SqliteStateStore:
+    """All users in one database. Thread-safe (one connection behind a lock)."""
+
+    name = "sqlite"
+
+    def __init__(self, db_path=STATE_DB, batch_size: int = STATE_BATCH, export: bool = STATE_EXPORT):
+        self.db_path    = Path(db_path)
+        self.batch_size = max(1, batch_size)
+        self.export     = export
+        self._json      = JsonStateStore()
+        self._lock      = threading.RLock()
+        self._pending   = {}    # owner → (state, path)
+        self.stats      = {"loaded": 0, "imported": 0, "saved": 0, "transactions": 0}
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+        atexit.register(self.close)
+
+    @staticmethod
+    def _key(owner: str) -> str:
+        return owner.lower()
+
+    # ── read ────────────────────────────────
+    def load(self, owner: str, path: str = None) -> dict:
+        key = self._key(owner)
+        with self._lock:
+            if key in self._pending:
+                return copy.deepcopy(self._pending[key][0])
+            row = self._conn.execute("SELECT state FROM codey_state WHERE owner = ?", (key,)).fetchone()
+            if row is None:
+                return self._import(owner, path)
+            state = json.loads(row[0])
+            if _history_log(owner) is None:     # legacy: log not started yet
+                entries = self._conn.execute(
+                    "SELECT entry FROM codey_history WHERE owner = ? ORDER BY timestamp DESC LIMIT ?",
+                    (key, HISTORY_WINDOW)).fetchall()
+                state["history"] = [json.loads(e[0]) for e in reversed(entries)]
+        self.stats["loaded"] += 1
+        return _read_through(owner, state)
+
+    def _import(self, owner: str, path: str) -> dict:
+        """First load of a user: take over the existing codey.json, if any."""
+        state = self._json.load(owner, path) if path else None
+        if state is not None:
+            self._write({self._key(owner): (state, path)})
+            self.stats["imported"] += 1
+            print(f"🗃️  Imported {path} into {self.db_path}")
+        return state
+
+    def history(self, owner: str, since: str = None) -> list:
+        """Every stored history entry of owner (optionally timestamp >= since), oldest first."""
+        log = _history_log(owner)
+        if log is not None:
+            return log.query(since)
+        self.flush()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT entry FROM codey_history WHERE owner = ? AND timestamp >= ? ORDER BY timestamp",
+                (self._key(owner), since or "")).fetchall()
+        return [json.loads(r[0]) for r in rows]
+
+    def owners(self) -> list:
+        self.flush()
+        with self._lock:
+            return [r[0] for r in self._conn.execute(
+                "SELECT owner FROM codey_state ORDER BY owner").fetchall()]
+
+    # ── write ───────────────────────────────
+    def save(self, owner: str, state: dict, path: str = None):
+        """Buffers the state; written with the next flush (every batch_size saves)."""
+        if self.export and path:
+            self._json.save(owner, state, path)
+        with self._lock:
+            self._pending[self._key(owner)] = (copy.deepcopy(state), path)
+            self.stats["saved"] += 1
+            full = len(self._pending) >= self.batch_size
+        if full:
+            self.flush()
+
+    def flush(self):
+        """Writes all pending states + their new history entries in one transaction."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            if pending:
+                self._write(pending)
+
+    def _write(self, pending: dict):
+        saved_at = clock_now(timezone.utc).isoformat()
+        states, entries = [], []
+        for key, (state, _) in pending.items():
+            current = {k: v for k, v in state.items() if k != "history"}
+            states.append((key, json.dumps(current), state.get("last_update"), saved_at))
+            if _history_log(key) is None:       # otherwise .codey/history has it
+                entries += [(key, e["timestamp"], json.dumps(e))
+                            for e in state.get("history", []) if e.get("timestamp")]
+        with self._lock, self._conn:     # one transaction — all or nothing
+            self._conn.executemany(
+                "INSERT INTO codey_state (owner, state, last_update, saved_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(owner) DO UPDATE SET state = excluded.state, "
+                "last_update = excluded.last_update, saved_at = excluded.saved_at", states)
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO codey_history (owner, timestamp, entry) VALUES (?, ?, ?)", entries)
+        self.stats["transactions"] += 1
+
+    def close(self):
+        with self._lock:
+            if self._conn is None:
+                return
+            self.flush()
+            self._conn.close()
+            self._conn = None
+
+    def print_summary(self):
+        s = self.stats
+        print(f"🗃️  State store ({self.db_path}): {s['loaded']} loaded, {s['imported']} imported, "
+              f"{s['saved']} saved in {s['transactions']} transaction(s)")
+
+
+def open_store(backend: str = STATE_BACKEND):
+    """State store for CODEY_STATE_BACKEND."""
+    if backend == "sqlite":
+        return SqliteStateStore()
+    if backend != "json":
+        raise ValueError(f"CODEY_STATE_BACKEND={backend!r} — expected json or sqlite")
+    return JsonStateStore()
+
+
+# Shared process-wide instance
+state_store = open_store()
+
+
+# ─────────────────────────────────────────────
+# CLI
+# ─────────────────────────────────────────────
+
+def main():
+    parser = argparse.ArgumentParser(description="Codey SQLite state store — export / list.")
+    parser.add_argument("--db", default=str(STATE_DB), help="database path (default: %(default)s)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    export = sub.add_parser("export", help="write one user's state as codey.json")
+    export.add_argument("owner")
+    export.add_argument("path", nargs="?", default="codey.json")
+    sub.add_parser("list", help="list stored users")
+    args = parser.parse_args()
+
+    store = SqliteStateStore(args.db, export=False)
+    if args.command == "list":
+        for owner in store.owners():
+            print(owner)
+        return
+    state = store.load(args.owner)
+    if state is None:
+        parser.exit(1, f"No state for {args.owner} in {args.db}\n")
+    JsonStateStore().save(args.owner, state, args.path)
+    print(f"💾 {args.path} written ({len(state.get('history', []))} history entries).")
+
+
+if __name__ == "__main__":
+    main()
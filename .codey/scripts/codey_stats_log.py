@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+# =============================================================================
+# codey_stats_log.py
+# Indexed access to .codey/stats_history.jsonl — without reading the file.
+#
+# The star-report scripts append one line per run, forever. Reading all of
+# it just to find the previous run gets slower every day. Instead:
+#
+#   tail(n)                 last n records, read backwards from the end
+#   last_for_date(date)     last record written on that date
+#   last_on_or_before(date) last record on or before that date
+#   days_ago(n)             value n days ago (last record on or before)
+#
+# Lookups by date go through a sidecar index next to the log:
+#
+#   .codey/stats_history.jsonl.idx
+#     header   "CSIX" | version u16 | bytes of the log already indexed u64
+#     entries  date (10 bytes, YYYY-MM-DD) | offset of that day's last line u64
+#
+# Entries are fixed-width and sorted by date, so a lookup is a binary search
+# with a handful of seeks — O(log n), the index is never loaded as a whole.
+# New lines are indexed incrementally from the stored byte count; a log that
+# shrank, a broken index or out-of-order dates trigger a full rebuild.
+# The index is derived data: delete it any time. Git-ignored — the star
+# report workflows keep it (and .codey/series) in actions/cache.
+#
+# Place in: .codey/scripts/codey_stats_log.py
+# =============================================================================
+# Licensed under Apache 2.0 & ESOL v1.1
+# https://github.com/ESOL-License/ESOL/
+# =============================================================================
+
+import json
+import os
+import struct
+from datetime import date as date_type, timedelta, timezone
+from pathlib import Path
+
+from codey_clock import now as clock_now
+
+# ─────────────────────────────────────────────
+# CONFIG
+# ─────────────────────────────────────────────
+STATS_JSONL   = Path(".codey/stats_history.jsonl")
+INDEX_VERSION = 1
+TAIL_BLOCK    = 8192
+
+_HEADER = struct.Struct("<4sHQ")    # magic, version, indexed bytes
+_ENTRY  = struct.Struct("<10sQ")    # date, offset of the day's last line
+_MAGIC  = b"CSIX"
+
+
+class StatsLog:
+    """One JSONL log + its date index."""
+
+    def __init__(self, path=STATS_JSONL, index_path=None):
+        self.path       = Path(path)
+        self.index_path = Path(index_path) if index_path else self.path.with_name(self.path.name + ".idx")
+
+    # ── raw reads ───────────────────────────
+    def _record_at(self, offset: int) -> dict:
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            return json.loads(f.readline())
+
+    def tail(self, n: int = 1) -> list:
+        """Last n complete records, oldest first — reads backwards in blocks from the end."""
+        try:
+            f = open(self.path, "rb")
+        except FileNotFoundError:
+            return []
+        with f:
+            end  = f.seek(0, os.SEEK_END)
+            pos  = end
+            data = b""
+            while pos > 0 and data.count(b"\n") <= n:
+                step = min(TAIL_BLOCK, pos)
+                pos -= step
+                f.seek(pos)
+                data = f.read(step) + data
+        lines = data.split(b"\n")
+        if pos > 0:
+            lines = lines[1:]               # first piece may start mid-line
+        records = []
+        for line in reversed(lines):
+            if len(records) == n:
+                break
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue                    # empty or torn line
+        return records[::-1]
+
+    # ── index ───────────────────────────────
+    def _scan(self, start: int) -> tuple:
+        """(day, offset) of every complete line from byte start on, and the new indexed size."""
+        found = []
+        with open(self.path, "rb") as f:
+            f.seek(start)
+            offset = start
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break                   # being written / torn — index it next time
+                try:
+                    day = json.loads(line).get("date", "")[:10]
+                except (json.JSONDecodeError, AttributeError):
+                    day = ""
+                if len(day) == 10:
+                    found.append((day, offset))
+                offset += len(line)
+        return found, offset
+
+    def _write_index(self, entries: list, indexed: int):
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.index_path, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, INDEX_VERSION, indexed))
+            for day, offset in entries:
+                f.write(_ENTRY.pack(day.encode("ascii"), offset))
+
+    def _rebuild(self, size: int):
+        found, indexed = self._scan(0) if size else ([], 0)
+        last = {}
+        for day, offset in found:
+            last[day] = max(offset, last.get(day, -1))
+        self._write_index(sorted(last.items()), indexed)
+
+    def _header(self):
+        try:
+            with open(self.index_path, "rb") as f:
+                raw   = f.read(_HEADER.size)
+                count = (f.seek(0, os.SEEK_END) - _HEADER.size) / _ENTRY.size
+        except FileNotFoundError:
+            return None
+        if len(raw) < _HEADER.size or count != int(count):
+            return None
+        magic, version, indexed = _HEADER.unpack(raw)
+        if magic != _MAGIC or version != INDEX_VERSION:
+            return None
+        return indexed, int(count)
+
+    def sync(self) -> int:
+        """Brings the index up to date with the log. Returns the number of indexed days."""
+        size   = self.path.stat().st_size if self.path.exists() else 0
+        header = self._header()
+        if header is None or header[0] > size:
+            self._rebuild(size)
+            return self._header()[1]
+        indexed, count = header
+        if indexed == size:
+            return count
+
+        found, new_indexed = self._scan(indexed)
+        with open(self.index_path, "r+b") as f:
+            last_day = self._entry(f, count - 1)[0] if count else ""
+            for day, offset in found:
+                if day < last_day:
+                    break                   # out of order → full rebuild below
+                if day == last_day:
+                    f.seek(_HEADER.size + (count - 1) * _ENTRY.size)
+                else:
+                    f.seek(_HEADER.size + count * _ENTRY.size)
+                    count   += 1
+                    last_day = day
+                f.write(_ENTRY.pack(day.encode("ascii"), offset))
+            else:
+                # Entries first, byte count last — an interrupted update is simply redone
+                f.seek(0)
+                f.write(_HEADER.pack(_MAGIC, INDEX_VERSION, new_indexed))
+                return count
+        self._rebuild(size)
+        return self._header()[1]
+
+    @staticmethod
+    def _entry(f, i: int) -> tuple:
+        f.seek(_HEADER.size + i * _ENTRY.size)
+        day, offset = _ENTRY.unpack(f.read(_ENTRY.size))
+        return day.decode("ascii"), offset
+
+    def last_on_or_before(self, day) -> dict:
+        """Last record with date <= day (date or 'YYYY-MM-DD'), None if there is none."""
+        day   = day.isoformat() if isinstance(day, date_type) else str(day)[:10]
+        count = self.sync()
+        if not count:
+            return None
+        with open(self.index_path, "rb") as f:
+            lo, hi = 0, count
+            while lo < hi:                  # first entry with date > day
+                mid = (lo + hi) // 2
+                if self._entry(f, mid)[0] <= day:
+                    lo = mid + 1
+                else:
+                    hi = mid
+            if lo == 0:
+                return None
+            _, offset = self._entry(f, lo - 1)
+        return self._record_at(offset)
+
+    def last_for_date(self, day) -> dict:
+        """Last record written on exactly that date, else None."""
+        record = self.last_on_or_before(day)
+        day    = day.isoformat() if isinstance(day, date_type) else str(day)[:10]
+        return record if record and record.get("date", "")[:10] == day else None
+
+    def days_ago(self, n: int, today: date_type = None) -> dict:
+        """Value n days ago: last record on or before today - n days."""
+        today = today or clock_now(timezone.utc).date()
+        return self.last_on_or_before(today - timedelta(days=n))
+
+    # ── write ───────────────────────────────
+    def append(self, record: dict):
+        """Appends one record (a torn last line is terminated first) and indexes it."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        line = json.dumps(record) + "\n"
+        with open(self.path, "a+b") as f:
+            if f.tell() > 0:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    line = "\n" + line
+            f.write(line.encode("utf-8"))
+        self.sync()
+
+
+# Shared instance for the default log
+stats_log = StatsLog()
@@ -0,0 +1,625 @@
+#!/usr/bin/env python3
+# =============================================================================
+# codey_stub_api.py
+# Local GitHub API stand-in for load-testing the collectors.
+#
+# Serves the endpoints Codey actually calls, with synthetic users of any size:
+#   GET  /users/{u}                      profile
+#   GET  /users/{u}/repos                own + forked repos (sort=pushed|updated|created)
+#   GET  /users/{u}/starred              starred repos (star+json → starred_at)
+#   GET  /users/{u}/events/public        push / PR / issue events (max 300, like GitHub)
+#   GET  /repos/{o}/{r}                  single repo
+#   GET  /repos/{o}/{r}/languages        language bytes
+#   GET  /repos/{o}/{r}/commits          commits (author / since filters)
+#   GET  /orgs/{o}/public_members        members of an org declared with --org
+#   GET  /orgs/{o}/repos                 org repos, commits by random members
+#   GET  /rate_limit                     budget of the calling token (free)
+#   POST /graphql                        star-report queries + the BULK_QUERY of update_codey.py
+#
+# Behaves like the real thing where it matters for performance work:
+# page/per_page pagination with Link headers, ETag + If-None-Match → 304,
+# X-RateLimit-* headers per token (304s are free), 403 when the budget is gone,
+# plus injected latency, 5xx errors and secondary rate limits (Retry-After).
+#
+# Every user login is valid — data is generated on first access and is
+# deterministic per (seed, login), so repeated runs see the same account.
+#
+# Usage:
+#   python .codey/scripts/codey_stub_api.py --port 8787 --repos 200 --latency 40 --error-rate 0.02
+#   CODEY_API_URL=http://127.0.0.1:8787 GIT_TOKEN=x GITHUB_REPOSITORY=alice/Codey python update_codey.py
+#
+# Request counts per endpoint are printed on Ctrl-C (and served at /_stub/stats).
+# =============================================================================
+# Licensed under Apache 2.0 & ESOL v1.1
+# https://github.com/ESOL-License/ESOL/
+# =============================================================================
+
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlencode, urlparse, parse_qs
+
+LANGUAGES = ["Python", "JavaScript", "TypeScript", "Go", "Rust", "Shell", "HTML", "CSS", "C", "Dockerfile"]
+LICENSES  = [("mit", "MIT License", "MIT"), ("apache-2.0", "Apache License 2.0", "Apache-2.0"),
+             ("gpl-3.0", "GNU General Public License v3.0", "GPL-3.0"), None]
+MESSAGES  = ["fix typo", "wip", "Add caching layer for API calls\n\nKeeps the run under the rate limit.",
+             "refactor parser", "Update README", "feat: new theme support",
+             "Bump dependencies", "docs: usage examples", "oops", "Handle empty responses gracefully"]
+ISSUES    = ["bug: crash on empty repo", "feature: dark theme", "please help", "docs typo",
+             "enhancement: faster sync", "urgent!!!", "refactor config loading"]
+
+
+# ─────────────────────────────────────────────
+# SYNTHETIC DATA
+# ─────────────────────────────────────────────
+
+def iso(ts: datetime) -> str:
+    return ts.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class Universe:
+    """Lazily generated, deterministic fake accounts. Thread-safe."""
+
+    def __init__(self, repos=30, forks=10, starred=120, events=300, self_stars=3, seed=1,
+                 orgs=(), org_members=10, org_repos=5):
+        self.sizes = {"repos": repos, "forks": forks, "starred": starred,
+                      "events": min(events, 300), "self_stars": self_stars,
+                      "org_members": org_members, "org_repos": org_repos}
+        self.seed  = seed
+        self.now   = datetime.now(timezone.utc).replace(microsecond=0)
+        self.orgs  = {o.lower() for o in orgs}
+        self._lock  = threading.Lock()
+        self._users = {}
+        self._orgs  = {}
+
+    def org(self, login: str) -> dict:
+        """Org data, or None if login is not a declared org."""
+        key = login.lower()
+        if key not in self.orgs:
+            return None
+        with self._lock:
+            if key not in self._orgs:
+                self._orgs[key] = self._build_org(login)
+            return self._orgs[key]
+
+    def _build_org(self, login: str) -> dict:
+        rnd     = random.Random(f"{self.seed}:org:{login.lower()}")
+        now     = self.now
+        members = [f"{login.lower()}-dev{i:03d}" for i in range(self.sizes["org_members"])]
+        repos, commits = [], {}
+        for i in range(self.sizes["org_repos"]):
+            name   = f"service-{i:03d}"
+            pushed = now - timedelta(hours=rnd.expovariate(1 / 30))
+            langs  = {lang: rnd.randint(500, 900_000) for lang in rnd.sample(LANGUAGES, rnd.randint(1, 3))}
+            repos.append({
+                "id": hash_id(login, name), "name": name, "full_name": f"{login}/{name}",
+                "owner": {"login": login}, "private": False, "html_url": f"https://github.com/{login}/{name}",
+                "description": f"Org service {name}", "fork": False, "archived": False, "disabled": False,
+                "stargazers_count": rnd.randint(0, 300), "forks_count": rnd.randint(0, 40),
+                "open_issues_count": rnd.randint(0, 30), "license": None, "language": max(langs, key=langs.get),
+                "created_at": iso(now - timedelta(days=rnd.randint(100, 2000))),
+                "updated_at": iso(pushed), "pushed_at": iso(pushed), "_languages": langs,
+            })
+            commits[name] = [
+                {"sha": sha(login, name, c),
+                 "commit": {"message": rnd.choice(MESSAGES),
+                            "author": {"name": author, "date": iso(pushed - timedelta(minutes=c * rnd.randint(5, 90)))}},
+                 "author": {"login": author}}
+                for c, author in enumerate(rnd.choices(members, k=rnd.randint(5, 40)))
+            ]
+        return {"members": [{"login": m, "id": hash_id(m), "type": "User"} for m in members],
+                "repos": repos, "repo_by_name": {r["name"].lower(): r for r in repos}, "commits": commits}
+
+    def user(self, login: str) -> dict:
+        key = login.lower()
+        with self._lock:
+            if key not in self._users:
+                self._users[key] = self._build(login)
+            return self._users[key]
+
+    def repo(self, owner: str, name: str) -> dict:
+        return (self.org(owner) or self.user(owner))["repo_by_name"].get(name.lower())
+
+    def commits(self, owner: str, name: str) -> list:
+        return (self.org(owner) or self.user(owner))["commits"].get(name.lower(), [])
+
+    def _build(self, login: str) -> dict:
+        rnd  = random.Random(f"{self.seed}:{login.lower()}")
+        now  = self.now
+        size = self.sizes
+
+        repos = []
+        for i in range(size["repos"] + size["forks"]):
+            fork    = i >= size["repos"]
+            name    = f"{'fork' if fork else 'project'}-{i:04d}"
+            created = now - timedelta(days=rnd.randint(30, 3000))
+            pushed  = now - timedelta(hours=rnd.expovariate(1 / 400))
+            pushed  = max(pushed, created)
+            updated = max(pushed, now - timedelta(hours=rnd.expovariate(1 / 300)))
+            langs   = {lang: rnd.randint(500, 400_000) for lang in rnd.sample(LANGUAGES, rnd.randint(1, 4))}
+            lic     = rnd.choice(LICENSES)
+            repos.append({
+                "id":                hash_id(login, name),
+                "name":              name,
+                "full_name":         f"{login}/{name}",
+                "owner":             {"login": login},
+                "private":           False,
+                "html_url":          f"https://github.com/{login}/{name}",
+                "description":       None if rnd.random() < 0.2 else f"Synthetic repo {name}",
+                "fork":              fork,
+                "archived":          rnd.random() < 0.05,
+                "disabled":          False,
+                "stargazers_count":  int(rnd.paretovariate(1.2)) - 1,
+                "forks_count":       int(rnd.paretovariate(1.5)) - 1,
+                "open_issues_count": rnd.randint(0, 12),
+                "license":           {"key": lic[0], "name": lic[1], "spdx_id": lic[2]} if lic else None,
+                "language":          max(langs, key=langs.get),
+                "created_at":        iso(created),
+                "updated_at":        iso(updated),
+                "pushed_at":         iso(pushed),
+                "_languages":        langs,
+            })
+
+        # Starred list, newest star first. A few own repos are self-starred.
+        own     = [r for r in repos if not r["fork"]]
+        starred = []
+        for r in rnd.sample(own, min(size["self_stars"], len(own))):
+            starred.append(r)
+        for j in range(max(0, size["starred"] - len(starred))):
+            other = f"dev{rnd.randint(1, 5000)}"
+            name  = f"lib-{j:05d}"
+            starred.append({"id": hash_id(other, name), "name": name, "full_name": f"{other}/{name}",
+                            "owner": {"login": other}, "fork": False, "stargazers_count": rnd.randint(0, 50_000),
+                            "html_url": f"https://github.com/{other}/{name}"})
+        rnd.shuffle(starred)
+        stars = []
+        ts    = now
+        for r in starred:
+            ts -= timedelta(hours=rnd.expovariate(1 / 48))
+            stars.append({"starred_at": iso(ts), "repo": r})
+
+        # Events newest first, spread over ~90 days with a dense last day
+        events = []
+        ts     = now
+        for k in range(size["events"]):
+            ts   -= timedelta(minutes=rnd.expovariate(1 / 300))
+            repo  = rnd.choice(own or repos)
+            kind  = rnd.choices(["PushEvent", "PullRequestEvent", "IssuesEvent", "WatchEvent"], [6, 2, 2, 1])[0]
+            if kind == "PushEvent":
+                commits = [{"sha": sha(login, k, c), "message": rnd.choice(MESSAGES),
+                            "author": {"name": login}} for c in range(rnd.randint(1, 5))]
+                payload = {"size": len(commits), "commits": commits}
+            elif kind == "PullRequestEvent":
+                merged  = rnd.random() < 0.7
+                payload = {"action": rnd.choice(["opened", "closed"]),
+                           "pull_request": {"title": rnd.choice(MESSAGES).split("\n")[0], "merged": merged}}
+            elif kind == "IssuesEvent":
+                payload = {"action": rnd.choice(["opened", "closed"]), "issue": {"title": rnd.choice(ISSUES)}}
+            else:
+                payload = {"action": "started"}
+            events.append({"id": str(90_000_000_000 - k),
+                           "type": kind, "actor": {"login": login},
+                           "repo": {"name": repo["full_name"]}, "payload": payload,
+                           "public": True, "created_at": iso(ts)})
+
+        # Commits per own repo: a handful, the newest at pushed_at
+        commits = {}
+        for r in own:
+            pushed = parse(r["pushed_at"])
+            commits[r["name"].lower()] = [
+                {"sha": sha(login, r["name"], c),
+                 "commit": {"message": rnd.choice(MESSAGES),
+                            "author": {"name": login, "date": iso(pushed - timedelta(hours=c * rnd.randint(1, 30)))}},
+                 "author": {"login": login}}
+                for c in range(rnd.randint(0, 8))
+            ]
+
+        return {
+            "profile": {
+                "login": login, "id": hash_id(login), "type": "User", "name": login.title(),
+                "public_repos": len(repos), "followers": int(rnd.paretovariate(1.1)) - 1,
+                "following": rnd.randint(0, 200),
+                "created_at": iso(now - timedelta(days=rnd.randint(400, 5000))),
+                "updated_at": iso(now),
+            },
+            "repos":        repos,
+            "repo_by_name": {r["name"].lower(): r for r in repos},
+            "stars":        stars,
+            "events":       events,
+            "commits":      commits,
+        }
+
+
+def hash_id(*parts) -> int:
+    return int(hashlib.sha1(":".join(map(str, parts)).encode()).hexdigest()[:8], 16)
+
+
+def sha(*parts) -> str:
+    return hashlib.sha1(":".join(map(str, parts)).encode()).hexdigest()
+
+
+def parse(ts: str) -> datetime:
+    return datetime.fromisoformat(ts.replace("Z", "+00:00"))
+
+
+def public(repo: dict) -> dict:
+    """Repo as the API returns it (without the generator's private fields)."""
+    return {k: v for k, v in repo.items() if not k.startswith("_")}
+
+
+# ─────────────────────────────────────────────
+# RATE LIMIT
+# ─────────────────────────────────────────────
+
+class Budgets:
+    """Per-token, per-resource request budget with a fixed reset window."""
+
+    def __init__(self, limits: dict, window: int):
+        self.limits  = limits
+        self.window  = window
+        self._lock   = threading.Lock()
+        self._state  = {}   # (token, resource) → [remaining, reset_epoch]
+
+    def take(self, token: str, resource: str, cost: int = 1) -> tuple:
+        """Charges cost calls. Returns (allowed, limit, remaining, reset)."""
+        limit = self.limits[resource]
+        now   = int(time.time())
+        with self._lock:
+            state = self._state.get((token, resource))
+            if state is None or state[1] <= now:
+                state = self._state[(token, resource)] = [limit, now + self.window]
+            if state[0] < cost:
+                return False, limit, state[0], state[1]
+            state[0] -= cost
+            return True, limit, state[0], state[1]
+
+
+# ─────────────────────────────────────────────
+# GRAPHQL
+# ─────────────────────────────────────────────
+
+def gql_repo(repo: dict) -> dict:
+    lic   = repo.get("license")
+    langs = repo.get("_languages", {})
+    return {
+        "name": repo["name"], "nameWithOwner": repo["full_name"], "description": repo.get("description"),
+        "isFork": repo["fork"], "isArchived": repo.get("archived", False), "isDisabled": False,
+        "isLocked": False, "stargazerCount": repo["stargazers_count"], "forkCount": repo.get("forks_count", 0),
+        "pushedAt": repo.get("pushed_at"), "updatedAt": repo.get("updated_at"),
+        "createdAt": repo.get("created_at"), "url": repo["html_url"], "owner": repo["owner"],
+        "licenseInfo": {"key": lic["key"], "name": lic["name"], "spdxId": lic["spdx_id"]} if lic else None,
+        "primaryLanguage": {"name": repo["language"]} if repo.get("language") else None,
+        "issues": {"totalCount": repo.get("open_issues_count", 0)},
+        "pullRequests": {"totalCount": 0},
+        "languages": {"edges": [{"size": n, "node": {"name": lang}} for lang, n in langs.items()]},
+    }
+
+
+def gql_page(items: list, after, first: int = 100) -> tuple:
+    start = int(after) if after and str(after).isdigit() else 0
+    chunk = items[start:start + first]
+    end   = start + len(chunk)
+    return chunk, {"hasNextPage": end < len(items), "endCursor": str(end) if chunk else None}
+
+
+def arg(query: str, connection: str, name: str):
+    """Inline argument of a connection, e.g. arg(q, "repositories", "isFork") → "true"."""
+    m = re.search(connection + r"\s*\(([^)]*)\)", query, re.S)
+    if not m:
+        return None
+    v = re.search(name + r"\s*:\s*(\"[^\"]*\"|\w+)", m.group(1))
+    return v.group(1).strip('"') if v else None
+
+
+def run_graphql(universe: Universe, query: str, variables: dict) -> dict:
+    m     = re.search(r'user\s*\(\s*login\s*:\s*"([^"]+)"', query)
+    login = variables.get("login") or (m.group(1) if m else None)
+    if not login:
+        return {"errors": [{"message": "stub: only user(login: ...) queries are supported"}]}
+    u    = universe.user(login)
+    user = {"login": u["profile"]["login"], "name": u["profile"]["name"],
+            "createdAt": u["profile"]["created_at"],
+            "followers": {"totalCount": u["profile"]["followers"]},
+            "following": {"totalCount": u["profile"]["following"]}}
+
+    with_repos = variables.get("withRepos", re.search(r"\brepositories\s*\(", query) is not None)
+    with_stars = variables.get("withStars", "starredRepositories" in query)
+
+    if with_repos:
+        repos   = u["repos"]
+        is_fork = arg(query, r"\brepositories", "isFork")
+        if is_fork in ("true", "false"):
+            repos = [r for r in repos if r["fork"] == (is_fork == "true")]
+        if "PUSHED_AT" in query:
+            repos = sorted(repos, key=lambda r: r["pushed_at"], reverse=True)
+        after = variables.get("reposAfter") or arg(query, r"\brepositories", "after")
+        chunk, info = gql_page(repos, after)
+        user["repositories"] = {"totalCount": len(repos), "nodes": [gql_repo(r) for r in chunk], "pageInfo": info}
+
+    if with_stars:
+        after = variables.get("starsAfter") or arg(query, "starredRepositories", "after")
+        chunk, info = gql_page(u["stars"], after)
+        user["starredRepositories"] = {
+            "nodes": [gql_repo(s["repo"]) if "_languages" in s["repo"] else
+                      {"name": s["repo"]["name"], "owner": s["repo"]["owner"]} for s in chunk],
+            "edges": [{"starredAt": s["starred_at"],
+                       "node": {"name": s["repo"]["name"], "owner": s["repo"]["owner"]}} for s in chunk],
+            "pageInfo": info,
+        }
+    return {"data": {"user": user}}
+
+
+# ─────────────────────────────────────────────
+# HTTP
+# ─────────────────────────────────────────────
+
+class StubAPIHandler(BaseHTTPRequestHandler):
+    protocol_version        = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    # set by serve()
+    universe     = None
+    budgets      = None
+    latency      = 0.0
+    jitter       = 0.0
+    error_rate   = 0.0
+    abuse_rate   = 0.0
+    hits         = Counter()
+    hits_lock    = threading.Lock()
+
+    # ── plumbing ────────────────────────────
+    def log_message(self, *args):
+        pass
+
+    def _count(self, key: str):
+        with self.hits_lock:
+            self.hits[key] += 1
+
+    def _send(self, status: int, body=None, headers: dict = None):
+        data = b"" if body is None else json.dumps(body).encode()
+        self.send_response(status)
+        for k, v in (headers or {}).items():
+            self.send_header(k, str(v))
+        if body is not None:
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        if data:
+            self.wfile.write(data)
+
+    def _chaos(self, endpoint: str) -> bool:
+        """Latency + injected failures. True if a failure response was sent."""
+        if self.latency or self.jitter:
+            time.sleep(self.latency + random.uniform(0, self.jitter))
+        roll = random.random()
+        if roll < self.error_rate:
+            self._count(f"{endpoint} → 502")
+            self._send(502, {"message": "Server Error (injected)"})
+            return True
+        if roll < self.error_rate + self.abuse_rate:
+            self._count(f"{endpoint} → 403 secondary")
+            self._send(403, {"message": "You have exceeded a secondary rate limit (injected)"},
+                       {"Retry-After": 1})
+            return True
+        return False
+
+    def _limit(self, resource: str, cost: int = 1):
+        """Charges the token's budget. Returns rate-limit headers, or None if 403 was sent."""
+        token = self.headers.get("Authorization") or self.client_address[0]
+        ok, limit, remaining, reset = self.budgets.take(token, resource, cost)
+        headers = {"X-RateLimit-Limit": limit, "X-RateLimit-Remaining": remaining,
+                   "X-RateLimit-Reset": reset, "X-RateLimit-Resource": resource}
+        if not ok:
+            self._count(f"{resource} → 403 exhausted")
+            self._send(403, {"message": "API rate limit exceeded (stub)"}, headers)
+            return None
+        return headers
+
+    def _rate_limit_status(self) -> tuple:
+        token     = self.headers.get("Authorization") or self.client_address[0]
+        resources = {}
+        for resource in ("core", "graphql"):
+            _, limit, remaining, reset = self.budgets.take(token, resource, 0)
+            resources[resource] = {"limit": limit, "remaining": remaining, "reset": reset,
+                                   "used": limit - remaining}
+        core    = resources["core"]
+        headers = {"X-RateLimit-Limit": core["limit"], "X-RateLimit-Remaining": core["remaining"],
+                   "X-RateLimit-Reset": core["reset"], "X-RateLimit-Resource": "core"}
+        return {"resources": resources, "rate": core}, headers
+
+    def _page(self, items: list, query: dict, default_per_page: int = 30) -> tuple:
+        per_page = max(1, min(100, int(query.get("per_page", [default_per_page])[0])))
+        page     = max(1, int(query.get("page", [1])[0]))
+        last     = max(1, -(-len(items) // per_page))
+        chunk    = items[(page - 1) * per_page:page * per_page]
+
+        def link(p):
+            q = {k: v[0] for k, v in query.items()}
+            q["page"] = p
+            return f'<http://{self.headers.get("Host")}{urlparse(self.path).path}?{urlencode(q)}>'
+
+        rels = []
+        if page < last:
+            rels += [f'{link(page + 1)}; rel="next"', f'{link(last)}; rel="last"']
+        if page > 1:
+            rels += [f'{link(1)}; rel="first"', f'{link(page - 1)}; rel="prev"']
+        return chunk, {"Link": ", ".join(rels)} if rels else {}
+
+    # ── REST ────────────────────────────────
+    def do_GET(self):
+        url   = urlparse(self.path)
+        query = parse_qs(url.query)
+        parts = [p for p in url.path.split("/") if p]
+
+        if parts == ["_stub", "stats"]:
+            with self.hits_lock:
+                return self._send(200, dict(self.hits))
+        if parts == ["rate_limit"]:
+            # Free like on GitHub — reports the budget without charging it
+            self._count("GET /rate_limit")
+            return self._send(200, *self._rate_limit_status())
+
+        endpoint, body, extra = self._route(parts, query)
+        self._count(endpoint)
+        if self._chaos(endpoint):
+            return
+        if body is None:
+            return self._send(404, {"message": "Not Found"})
+
+        etag = '"%s"' % hashlib.sha1(json.dumps(body, sort_keys=True).encode()).hexdigest()
+        if self.headers.get("If-None-Match") == etag:
+            # Conditional hits don't count against the primary limit (same as GitHub)
+            self._count(f"{endpoint} → 304")
+            return self._send(304, None, {"ETag": etag, **extra})
+
+        rl = self._limit("core")
+        if rl is None:
+            return
+        self._send(200, body, {"ETag": etag, **rl, **extra})
+
+    def _route(self, parts: list, query: dict) -> tuple:
+        """Returns (endpoint_label, body or None, extra headers)."""
+        u = self.universe
+        if len(parts) == 2 and parts[0] == "users":
+            return "GET /users/*", u.user(parts[1])["profile"], {}
+
+        if len(parts) == 3 and parts[0] == "users" and parts[2] == "repos":
+            repos = u.user(parts[1])["repos"]
+            sort  = query.get("sort", ["full_name"])[0]
+            if sort in ("pushed", "updated", "created"):
+                repos = sorted(repos, key=lambda r: r[f"{sort}_at"], reverse=True)
+            else:
+                repos = sorted(repos, key=lambda r: r["full_name"].lower())
+            chunk, extra = self._page([public(r) for r in repos], query)
+            return "GET /users/*/repos", chunk, extra
+
+        if len(parts) == 3 and parts[0] == "users" and parts[2] == "starred":
+            stars = u.user(parts[1])["stars"]
+            if query.get("direction", ["desc"])[0] == "asc":
+                stars = stars[::-1]
+            chunk, extra = self._page(stars, query)
+            if "star+json" in (self.headers.get("Accept") or ""):
+                chunk = [{"starred_at": s["starred_at"], "repo": public(s["repo"])} for s in chunk]
+            else:
+                chunk = [public(s["repo"]) for s in chunk]
+            return "GET /users/*/starred", chunk, extra
+
+        if len(parts) == 4 and parts[0] == "users" and parts[2:] == ["events", "public"]:
+            chunk, extra = self._page(u.user(parts[1])["events"], query)
+            return "GET /users/*/events/public", chunk, extra
+
+        if len(parts) == 3 and parts[0] == "orgs" and parts[2] in ("public_members", "repos"):
+            org = u.org(parts[1])
+            if org is None:
+                return f"GET /orgs/*/{parts[2]}", None, {}
+            items = org["members"] if parts[2] == "public_members" else [public(r) for r in org["repos"]]
+            chunk, extra = self._page(items, query)
+            return f"GET /orgs/*/{parts[2]}", chunk, extra
+
+        if len(parts) >= 3 and parts[0] == "repos":
+            repo = u.repo(parts[1], parts[2])
+            if len(parts) == 3:
+                return "GET /repos/*/*", public(repo) if repo else None, {}
+            if parts[3:] == ["languages"]:
+                return "GET /repos/*/*/languages", repo["_languages"] if repo else None, {}
+            if parts[3:] == ["commits"]:
+                if repo is None:
+                    return "GET /repos/*/*/commits", None, {}
+                commits = u.commits(parts[1], parts[2])
+                author  = query.get("author", [None])[0]
+                since   = query.get("since", [None])[0]
+                if author:
+                    commits = [c for c in commits if c["author"]["login"].lower() == author.lower()]
+                if since:
+                    since_ts = parse(since)
+                    commits  = [c for c in commits if parse(c["commit"]["author"]["date"]) >= since_ts]
+                chunk, extra = self._page(commits, query)
+                return "GET /repos/*/*/commits", chunk, extra
+
+        return "GET (unknown)", None, {}
+
+    # ── GraphQL ─────────────────────────────
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        raw    = self.rfile.read(length) if length else b""
+        if urlparse(self.path).path.rstrip("/") != "/graphql":
+            self._count("POST (unknown)")
+            return self._send(404, {"message": "Not Found"})
+
+        self._count("POST /graphql")
+        if self._chaos("POST /graphql"):
+            return
+        try:
+            payload = json.loads(raw or b"{}")
+        except ValueError:
+            return self._send(400, {"message": "Problems parsing JSON"})
+
+        rl = self._limit("graphql")
+        if rl is None:
+            return
+        body = run_graphql(self.universe, payload.get("query", ""), payload.get("variables") or {})
+        self._send(200, body, rl)
+
+
+# ─────────────────────────────────────────────
+# MAIN
+# ─────────────────────────────────────────────
+
+def serve(host="127.0.0.1", port=8787, universe=None, core_limit=5000, graphql_limit=5000,
+          reset_window=3600, latency_ms=0.0, jitter_ms=0.0, error_rate=0.0, abuse_rate=0.0):
+    """Starts the stub in a background thread. Returns (server, base_url)."""
+    StubAPIHandler.universe   = universe or Universe()
+    StubAPIHandler.budgets    = Budgets({"core": core_limit, "graphql": graphql_limit}, reset_window)
+    StubAPIHandler.latency    = latency_ms / 1000
+    StubAPIHandler.jitter     = jitter_ms / 1000
+    StubAPIHandler.error_rate = error_rate
+    StubAPIHandler.abuse_rate = abuse_rate
+    server = ThreadingHTTPServer((host, port), StubAPIHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description="Local GitHub API stand-in for Codey load tests.")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8787)
+    p.add_argument("--repos", type=int, default=30, help="own repos per user")
+    p.add_argument("--forks", type=int, default=10, help="forked repos per user")
+    p.add_argument("--starred", type=int, default=120, help="starred repos per user")
+    p.add_argument("--self-stars", type=int, default=3, help="own repos the user starred")
+    p.add_argument("--events", type=int, default=300, help="public events per user (max 300)")
+    p.add_argument("--seed", type=int, default=1)
+    p.add_argument("--org", action="append", default=[], help="login served as an org (repeatable)")
+    p.add_argument("--org-members", type=int, default=10, help="public members per org")
+    p.add_argument("--org-repos", type=int, default=5, help="repos per org")
+    p.add_argument("--core-limit", type=int, default=5000)
+    p.add_argument("--graphql-limit", type=int, default=5000)
+    p.add_argument("--reset-window", type=int, default=3600, help="seconds")
+    p.add_argument("--latency", type=float, default=0.0, help="ms per request")
+    p.add_argument("--jitter", type=float, default=0.0, help="extra random ms per request")
+    p.add_argument("--error-rate", type=float, default=0.0, help="fraction answered with 502")
+    p.add_argument("--abuse-rate", type=float, default=0.0, help="fraction answered with 403 + Retry-After")
+    a = p.parse_args()
+
+    universe = Universe(a.repos, a.forks, a.starred, a.events, a.self_stars, a.seed,
+                        a.org, a.org_members, a.org_repos)
+    server, base = serve(a.host, a.port, universe, a.core_limit, a.graphql_limit, a.reset_window,
+                         a.latency, a.jitter, a.error_rate, a.abuse_rate)
+    print(f"🧪 Stub GitHub API at {base} — set CODEY_API_URL={base}")
+    print(f"   {a.repos} repos + {a.forks} forks, {a.starred} starred, {min(a.events, 300)} events per user")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+        print("")
+        for endpoint, n in StubAPIHandler.hits.most_common():
+            print(f"  {n:>7}  {endpoint}")
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+# =============================================================================
+# codey_tokens.py
+# Token pool — spread fleet runs over several GitHub tokens.
+#
+# One token = 5000 core calls per hour. A batch / org run of a few hundred
+# users burns through that long before the queue is empty. With
+#
+#   CODEY_TOKENS="ghp_aaa,ghp_bbb,ghp_ccc"      (comma or whitespace separated)
+#
+# every request goes out with the token that has the most budget left for
+# its resource (core / graphql), as seen in the X-RateLimit-* headers of its
+# last response or in a /rate_limit probe. A token that hits 0 (or gets a
+# primary-limit 403) is parked until its reset — the request is re-sent
+# with the next token instead of failing.
+#
+# GIT_TOKEN / GITHUB_TOKEN still work and are simply one more token in the
+# pool. No token at all = one anonymous slot, same as before.
+#
+# The rate limiter (codey_ratelimit.py) sees the POOL: summed limit and
+# remaining of all tokens that are not parked. So pacing, the optional
+# reserve and the fleet budget scale with the number of tokens.
+#
+# Place in: .codey/scripts/codey_tokens.py
+# =============================================================================
+# Licensed under Apache 2.0 & ESOL v1.1
+# https://github.com/ESOL-License/ESOL/
+# =============================================================================
+
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+
+from codey_ratelimit import rate_limiter
+
+
+def configured_tokens() -> list:
+    """CODEY_TOKENS + GIT_TOKEN / GITHUB_TOKEN, de-duplicated, in that order."""
+    tokens = re.split(r"[,\s]+", os.environ.get("CODEY_TOKENS", ""))
+    tokens.append(os.environ.get("GIT_TOKEN") or os.environ.get("GITHUB_TOKEN") or "")
+    return list(dict.fromkeys(t.strip() for t in tokens if t and t.strip()))
+
+
+class _Token:
+    def __init__(self, index: int, value: str):
+        self.value    = value
+        self.label    = f"#{index + 1} …{value[-4:]}" if value else "anonymous"
+        self.budgets  = {}          # resource → {'limit', 'remaining', 'reset', 'parked_until'}
+        self.requests = Counter()   # resource → requests sent
+        self.parked   = 0           # times this token ran dry
+
+
+class TokenPool:
+    """Picks a token per request and tracks each token's budget. Thread-safe."""
+
+    def __init__(self, tokens: list):
+        self._lock   = threading.Lock()
+        self._tokens = [_Token(i, t) for i, t in enumerate(tokens)] or [_Token(0, None)]
+
+    def __len__(self):
+        return len(self._tokens)
+
+    @property
+    def primary(self) -> str:
+        """First configured token (None when running anonymously)."""
+        return self._tokens[0].value
+
+    @staticmethod
+    def auth(token: _Token) -> dict:
+        return {"Authorization": f"token {token.value}"} if token.value else {}
+
+    # ── request side ────────────────────────
+    def acquire(self, resource: str = "core") -> _Token:
+        """Token with the most remaining budget for resource. Unknown budget counts as full."""
+        now = time.time()
+        with self._lock:
+            ready = [t for t in self._tokens
+                     if t.budgets.get(resource, {}).get("parked_until", 0) <= now]
+            if ready:
+                token = max(ready, key=lambda t: (t.budgets.get(resource, {}).get("remaining", float("inf")),
+                                                  -t.requests[resource]))
+            else:
+                # All parked — the one that resets first; the rate limiter does the waiting
+                token = min(self._tokens, key=lambda t: t.budgets[resource]["parked_until"])
+            b = token.budgets.get(resource)
+            if b and b.get("remaining"):
+                b["remaining"] -= 1          # count locally, concurrent workers spread out
+            token.requests[resource] += 1
+            return token
+
+    def available(self, resource: str = "core") -> bool:
+        """True while at least one token is not parked."""
+        now = time.time()
+        with self._lock:
+            return any(t.budgets.get(resource, {}).get("parked_until", 0) <= now for t in self._tokens)
+
+    def is_parked(self, token: _Token, resource: str = "core") -> bool:
+        with self._lock:
+            return token.budgets.get(resource, {}).get("parked_until", 0) > time.time()
+
+    # ── response side ───────────────────────
+    def record(self, token: _Token, status_code: int, headers, resource: str = "core") -> str:
+        """Updates the token's budget from X-RateLimit-* headers. Returns the actual resource."""
+        resource = (headers or {}).get("X-RateLimit-Resource") or resource
+        try:
+            limit     = headers.get("X-RateLimit-Limit")
+            remaining = headers.get("X-RateLimit-Remaining")
+            reset     = headers.get("X-RateLimit-Reset")
+            self._set(token, resource,
+                      int(limit) if limit is not None else None,
+                      int(remaining) if remaining is not None else None,
+                      int(reset) if reset is not None else None)
+        except (AttributeError, TypeError, ValueError):
+            pass
+        return resource
+
+    def _set(self, token: _Token, resource: str, limit, remaining, reset):
+        with self._lock:
+            b = token.budgets.setdefault(resource, {})
+            if limit is not None:
+                b["limit"] = limit
+            if remaining is not None:
+                b["remaining"] = remaining
+            if reset is not None:
+                b["reset"] = reset
+            if remaining == 0 and b.get("reset"):
+                if b.get("parked_until", 0) <= time.time():
+                    token.parked += 1
+                    if len(self._tokens) > 1:
+                        print(f"🔑 Token {token.label} out of {resource} budget — parked until "
+                              f"{time.strftime('%H:%M UTC', time.gmtime(b['reset']))}", file=sys.stderr)
+                b["parked_until"] = b["reset"] + 1
+
+    def _pool_view(self, resource: str) -> dict:
+        """All tokens as one budget: summed limit, remaining of the unparked ones,
+        latest reset (earliest un-park when all are parked). None = nothing known yet."""
+        now = time.time()
+        with self._lock:
+            known = [t.budgets[resource] for t in self._tokens if "limit" in t.budgets.get(resource, {})]
+            if not known:
+                return None
+            ready = [b for b in known if b.get("parked_until", 0) <= now]
+            return {
+                "X-RateLimit-Resource":  resource,
+                "X-RateLimit-Limit":     sum(b["limit"] for b in known),
+                "X-RateLimit-Remaining": sum(b.get("remaining") or 0 for b in ready),
+                "X-RateLimit-Reset":     max(b.get("reset") or 0 for b in ready) if ready
+                                         else min(b["parked_until"] for b in known),
+            }
+
+    def limiter_view(self, status_code: int, headers, resource: str = "core") -> tuple:
+        """(status, headers) for rate_limiter.after_response. One token: unchanged."""
+        view = self._pool_view(resource) if len(self._tokens) > 1 else None
+        if view is None:
+            return status_code, headers
+        if headers and headers.get("Retry-After"):
+            view["Retry-After"] = headers.get("Retry-After")   # secondary limits are not per token
+        return status_code, view
+
+    # ── probe ───────────────────────────────
+    def probe(self, get) -> bool:
+        """
+        get(auth_headers) → response of GET /rate_limit (free). Fills every token's
+        budget and hands the pool view to the rate limiter. True if any probe worked.
+        """
+        ok = False
+        for token in self._tokens:
+            try:
+                r = get(self.auth(token))
+                resources = r.json().get("resources", {}) if r.ok else None
+            except Exception as e:
+                print(f"🔑 Rate limit probe failed for {token.label}: {e}", file=sys.stderr)
+                continue
+            if resources is None:
+                print(f"🔑 Rate limit probe failed for {token.label}: HTTP {r.status_code}", file=sys.stderr)
+                continue
+            for resource, b in resources.items():
+                self._set(token, resource, b.get("limit"), b.get("remaining"), b.get("reset"))
+            ok = True
+
+        for resource in ("core", "graphql"):
+            view = self._pool_view(resource)
+            if view:
+                rate_limiter.after_response(200, view, resource)
+        return ok
+
+    # ── reporting ───────────────────────────
+    def print_summary(self):
+        """Per-token usage — only interesting with more than one token."""
+        if len(self._tokens) < 2:
+            return
+        with self._lock:
+            rows = [(t.label, dict(t.requests), {k: dict(v) for k, v in t.budgets.items()}, t.parked)
+                    for t in self._tokens]
+        for label, requests, budgets, parked in rows:
+            used = ", ".join(f"{n} {res}" for res, n in sorted(requests.items())) or "unused"
+            left = ", ".join(f"{res} {b['remaining']}/{b.get('limit', '?')}"
+                             for res, b in sorted(budgets.items())
+                             if res in ("core", "graphql") and b.get("remaining") is not None)
+            print(f"🔑 Token {label}: {used}" + (f" | left: {left}" if left else "")
+                  + (f" | parked {parked}x" if parked else ""))
+
+
+def pooled_request(send, resource: str = "core"):
+    """
+    send(auth_headers) → response. Sends with the best token, records its budget
+    and feeds the rate limiter. A primary-limit 403/429 parks the token and the
+    request is re-sent with the next one — as long as any token has budget left.
+    """
+    for _ in range(len(token_pool)):
+        token    = token_pool.acquire(resource)
+        resp     = send(token_pool.auth(token))
+        resource = token_pool.record(token, resp.status_code, resp.headers, resource)
+        if resp.status_code not in (403, 429) or not token_pool.is_parked(token, resource) \
+                or not token_pool.available(resource):
+            break
+        print(f"🔑 Retrying with another token ({resource})", file=sys.stderr)
+    rate_limiter.after_response(*token_pool.limiter_view(resp.status_code, resp.headers, resource), resource)
+    return resp
+
+
+# Shared process-wide instance
+token_pool = TokenPool(configured_tokens())
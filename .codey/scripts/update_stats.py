@@ -10,19 +10,25 @@
 # https://github.com/ESOL-License/ESOL/
 # =============================================================================
 
-import requests
 import os
-import json
-from datetime import datetime, timezone
+from datetime import timezone
 from pathlib import Path
 
+from codey_http import get_session, HTTP_TIMEOUT, GRAPHQL_URL
+from codey_clock import now as clock_now
+from codey_atomic import atomic_write
+from codey_ratelimit import rate_limiter
+from codey_retry import request_with_retry, endpoint_key, retry_stats
+from codey_tokens import token_pool, pooled_request
+from codey_snapshot import load_snapshot, graphql_nodes
+from codey_stats_log import stats_log
+from codey_series import stats_series
+
 # ─────────────────────────────────────────────
 # CONFIG
 # ─────────────────────────────────────────────
 USERNAME = os.environ.get("GITHUB_REPOSITORY", "").split("/")[0] or "VolkanSah"
-TOKEN    = os.environ.get("GIT_TOKEN") or os.environ.get("GITHUB_TOKEN")
-HEADERS  = {"Authorization": f"Bearer {TOKEN}"}
-JSONL    = Path(".codey/stats_history.jsonl")
+TOKEN    = token_pool.primary   # CODEY_TOKENS / GIT_TOKEN / GITHUB_TOKEN
 REPORT   = Path("STAR_REPORT.md")
 
 if not TOKEN:
@@ -44,7 +50,16 @@ def fetch_repos(is_fork: bool) -> list:
             pageInfo { hasNextPage endCursor }
         }}}""" % (USERNAME, str(is_fork).lower(), after)
 
-        r = requests.post("https://api.github.com/graphql", json={"query": query}, headers=HEADERS)
+        if not rate_limiter.before_request("graphql"):
+            exit(1)
+        r, err = request_with_retry(
+            lambda: pooled_request(lambda auth: get_session().post(
+                GRAPHQL_URL, json={"query": query}, headers=auth, timeout=HTTP_TIMEOUT), "graphql"),
+            endpoint_key("POST", GRAPHQL_URL)
+        )
+        if r is None:
+            print(f"Network error: {err}")
+            exit(1)
         r.raise_for_status()
         data = r.json()
 
@@ -144,7 +159,7 @@ def write_report(own: dict, fork: dict, now: str):
             repo_row(r)
     end("FORK_REPOS")
 
-    REPORT.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    atomic_write(REPORT, "\n".join(lines) + "\n", backup=True)
     print(f"STAR_REPORT.md written.")
 
 
@@ -153,7 +168,6 @@ def write_report(own: dict, fork: dict, now: str):
 # ─────────────────────────────────────────────
 
 def append_jsonl(own: dict, fork: dict, now: str):
-    JSONL.parent.mkdir(parents=True, exist_ok=True)
     record = {
         "date":               now[:10],
         "run_utc":            now,
@@ -173,8 +187,8 @@ def append_jsonl(own: dict, fork: dict, now: str):
             for r in own["active_repos"][:10]
         ],
     }
-    with open(JSONL, "a", encoding="utf-8") as f:
-        f.write(json.dumps(record) + "\n")
+    stats_log.append(record)   # indexed append (codey_stats_log.py)
+    stats_series.sync()        # numeric columns follow the log (codey_series.py)
     print(f"stats_history.jsonl updated.")
 
 
@@ -183,16 +197,23 @@ def append_jsonl(own: dict, fork: dict, now: str):
 # ─────────────────────────────────────────────
 
 if __name__ == "__main__":
-    now = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
+    now = clock_now(timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
     print(f"Collecting stats for {USERNAME} — {now}")
 
-    print("Fetching own repos...")
-    own_raw  = fetch_repos(False)
-    own      = process(own_raw, USERNAME)
+    # Today's snapshot from update_codey.py → no API calls at all
+    snapshot = load_snapshot(USERNAME)
+    if snapshot:
+        own_raw  = graphql_nodes(snapshot, False)
+        fork_raw = graphql_nodes(snapshot, True)
+    else:
+        print("Fetching own repos...")
+        own_raw  = fetch_repos(False)
+
+        print("Fetching forked repos...")
+        fork_raw = fetch_repos(True)
 
-    print("Fetching forked repos...")
-    fork_raw = fetch_repos(True)
-    fork     = process(fork_raw, USERNAME)
+    own  = process(own_raw, USERNAME)
+    fork = process(fork_raw, USERNAME)
 
     print(f"Own: {own['active_count']} active, {own['active_stars']} stars")
     print(f"Fork: {fork['active_count']} active, {fork['active_stars']} stars")
@@ -201,4 +222,6 @@ if __name__ == "__main__":
     write_report(own, fork, now)
     append_jsonl(own, fork, now)
 
+    token_pool.print_summary()
+    retry_stats.print_summary()
     print("Done.")
@@ -10,8 +10,13 @@
 
 import json # Standard library to parse JSON data
 import os # Standard library for file and directory path operations
+import sys # Standard library to extend the module search path
 from datetime import datetime # Library to handle timestamps
 
+# Shared Codey helpers live in .codey/scripts (atomic writes + backups)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", ".codey", "scripts"))
+from codey_atomic import atomic_write
+
 # Basis-Verzeichnis relativ zum Root des Repos
 BASE_DIR = ".codey_audit"
 
@@ -114,10 +119,9 @@ def generate_markdown():
         "**_End of Audit Report_**"
     ])
 
-    # Defining output path and writing the file
+    # Defining output path and writing the file (temp + fsync + rename, previous report kept as backup)
     output_path = os.path.join(BASE_DIR, "AUDIT_DATA.md")
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write("\n".join(md_content))
+    atomic_write(output_path, "\n".join(md_content), backup=True)
 
 # Script execution entry point
 if __name__ == "__main__":
@@ -26,22 +26,75 @@
 # =============================================================================
 # Version 2.2.3 -DEV-
 # Added RUN GUARD + some fixes
-import requests
 import json
 import os
 import sys
+import threading
 from datetime import datetime, timedelta, timezone
 from collections import Counter
+from concurrent.futures import wait
+from pathlib import Path
+from urllib.parse import urlparse, parse_qs
+
+import requests
+
+# NEW: shared helpers live in .codey/scripts (pooled HTTP session etc.)
+sys.path.insert(0, str(Path(__file__).resolve().parent / '.codey' / 'scripts'))
+from codey_http import (get_session, HTTP_TIMEOUT, API_URL, GRAPHQL_URL, count_request,
+                        print_request_summary, ScopedThreadPool)
+from codey_cache import HttpCache, CACHE_ENABLED
+from codey_ratelimit import rate_limiter
+from codey_retry import request_with_retry, endpoint_key, retry_stats, request_deadline, request_timeout
+from codey_starred import sync_self_stars, StarredFetchError
+from codey_singleflight import singleflight, request_key
+from codey_cassette import cassette_active
+from codey_clock import now as clock_now
+from codey_snapshot import write_snapshot, load_snapshot
+from codey_batch import load_manifest, run_batch, write_summary, print_summary as print_batch_summary, BATCH_OUT
+from codey_fleet import (plan_fleet, print_plan, available_budget, save_costs, load_costs,
+                         expected_cost, read_state)
+from codey_shard import shard_filter, lease_store, leased
+from codey_org import org_aggregate, print_org_summary
+from codey_tokens import token_pool, pooled_request
+from codey_state import state_store
+from codey_atomic import atomic_write, atomic_write_json
+from codey_history import record_history
 
 # ─────────────────────────────────────────────
 # CONFIG
 # ─────────────────────────────────────────────
 
-TOKEN = os.environ.get('GIT_TOKEN') or os.environ.get('GITHUB_TOKEN')
+TOKEN = token_pool.primary   # NEW: first of CODEY_TOKENS / GIT_TOKEN / GITHUB_TOKEN (codey_tokens.py)
 REPO  = os.environ.get('GIT_REPOSITORY') or os.environ.get('GITHUB_REPOSITORY')
 # Bypass fallback
 # ── CONFIG ──
 ENABLE_FALLBACK = os.environ.get('CODEY_FALLBACK', 'false').lower() == 'true'
+# NEW: parallel page fetching — max concurrent page requests per paginated endpoint
+PAGE_WORKERS    = int(os.environ.get('CODEY_PAGE_WORKERS', 4))
+# NEW: language analysis over ALL own repos — concurrent, cached per repo by pushed_at
+LANG_WORKERS    = int(os.environ.get('CODEY_LANG_WORKERS', 8))
+LANG_CACHE      = Path('.codey/languages_cache.json')
+_lang_cache_lock = threading.Lock()
+# NEW: commit fallback — only repos pushed inside the window, parallel, hard time budget
+FALLBACK_WORKERS = int(os.environ.get('CODEY_FALLBACK_WORKERS', 4))
+FALLBACK_BUDGET  = float(os.environ.get('CODEY_FALLBACK_BUDGET', 15))
+# NEW: incremental events — only pages newer than the last seen event are fetched
+EVENT_LOG_DIR   = Path('.codey/events')
+EVENT_LOG_MAX   = 300          # GitHub never serves more than 300 events / 90 days
+# NEW: incremental repo sync — local index, full resync every N days catches deletes/renames
+REPO_INDEX_DIR  = Path('.codey/repos')
+REPO_FULL_SYNC_DAYS = int(os.environ.get('CODEY_REPO_FULL_SYNC_DAYS', 7))
+# NEW: `python update_codey.py --collect` → only write .codey/snapshot/, no scoring / SVG
+COLLECT_ONLY    = '--collect' in sys.argv[1:]
+# Scoring always works on fresh data — a snapshot is only reused if a `--collect`
+# step of the same pipeline wrote it just now (minutes, 0 = never reuse)
+SCORE_SNAPSHOT_MINUTES = float(os.environ.get('CODEY_SCORE_SNAPSHOT_MINUTES', 15))
+# NEW: `python update_codey.py --batch team.txt` → one Codey per listed user (codey_batch.py)
+BATCH_MANIFEST  = sys.argv[sys.argv.index('--batch') + 1] if '--batch' in sys.argv[1:-1] else None
+# NEW: `python update_codey.py --org acme` → every public member of an org (codey_org.py)
+ORG_NAME        = sys.argv[sys.argv.index('--org') + 1] if '--org' in sys.argv[1:-1] else None
+# Org repos all members commit to — set once in org mode, read by the commit fallback
+SHARED_REPOS    = []
 
 if not REPO:
     print("WARNING: No REPO set. Using 'VolkanSah' as fallback.")
@@ -77,7 +130,7 @@ def should_run_full_update(codey):
         return True, 999.0
     try:
         last_dt     = datetime.fromisoformat(last.replace('Z', '+00:00'))
-        now         = datetime.now(timezone.utc)
+        now         = clock_now(timezone.utc)
         hours_since = (now - last_dt).total_seconds() / 3600
 
         # Primär: anderer Kalendertag → immer updaten
@@ -113,23 +166,77 @@ OWNER        = REPO.split('/')[0]
 # API HELPERS
 # ─────────────────────────────────────────────
 
-headers = {}
-if TOKEN:
-    headers = {
-        'Authorization': f'token {TOKEN}',
-        'Accept': 'application/vnd.github.v3+json'
-    }
-else:
+# Authorization is added per request by the token pool (codey_tokens.py)
+headers = {'Accept': 'application/vnd.github.v3+json'}
+if not TOKEN:
     print("NOTE: No token set - heavily rate-limited.", file=sys.stderr)
+elif len(token_pool) > 1:
+    print(f"🔑 Token pool: {len(token_pool)} tokens")
+
+
+# NEW: ETag / Last-Modified disk cache — 304s are free (no rate limit cost)
+# Off while a cassette records/replays: 304s would depend on cache contents.
+http_cache = HttpCache(enabled=CACHE_ENABLED and not cassette_active())
+
+
+def get_json_safe(url, params=None, cached=False, essential=True, accept=None):
+    """GET request with full error handling. Returns (ok: bool, data).
+    IMPROVED: goes through the shared keep-alive session — one handshake per host, not per page.
+    NEW: cached=True sends If-None-Match / If-Modified-Since and serves 304 from .codey/http_cache.
+    NEW: essential=False marks optional calls — skipped by the rate limiter when budget runs low.
+    NEW: accept overrides the Accept header (e.g. starred_at via vnd.github.star+json).
+    """
+    ok, data, _ = get_json_with_headers(url, params, cached, essential, accept)
+    return ok, data
 
 
-def get_json_safe(url, params=None):
-    """GET request with full error handling. Returns (ok: bool, data)."""
+def get_json_with_headers(url, params=None, cached=False, essential=True, accept=None, shared=False):
+    """Same as get_json_safe, but returns (ok, data, response_headers) — needed for Link paging.
+    NEW: identical requests within a run share one call and one result (single-flight).
+    shared=True: also across the users of a batch / org run (org repos).
+    """
+    return singleflight.do(
+        request_key('GET', url, params, accept=accept),
+        lambda: _get_json_uncoalesced(url, params, cached, essential, accept),
+        keep=lambda result: result[0],
+        shared=shared
+    )
+
+
+def _get_json_uncoalesced(url, params, cached, essential, accept):
+    if not rate_limiter.before_request('core', essential):
+        print(f"⏭️  Rate limit low — skipped {url}", file=sys.stderr)
+        return False, None, {}
+
+    req_headers = {**headers, 'Accept': accept} if accept else headers
+    if cached:
+        req_headers = {**req_headers, **http_cache.conditional_headers(url, params)}
+
+    def send_with(auth):
+        count_request('rest')
+        return get_session().get(url, headers={**req_headers, **auth}, params=params,
+                                 timeout=request_timeout(HTTP_TIMEOUT))
+
+    def send():
+        return pooled_request(send_with, 'core')
+
+    # NEW: jittered retries + circuit breaker — one 502 no longer truncates a dataset
     try:
-        r = requests.get(url, headers=headers, params=params, timeout=20)
+        r, err = request_with_retry(send, endpoint_key('GET', url))
     except Exception as e:
-        print(f"Network-Error at {url}: {e}", file=sys.stderr)
-        return False, None
+        r, err = None, e
+    if r is None:
+        print(f"Network-Error at {url}: {err}", file=sys.stderr)
+        return False, None, {}
+
+    if cached and r.status_code == 304:
+        body = http_cache.load(url, params)
+        if body is not None:
+            resp_headers = requests.structures.CaseInsensitiveDict(r.headers)
+            resp_headers.setdefault('Link', http_cache.link(url, params))
+            return True, body, resp_headers
+        # body file lost → one unconditional retry
+        return _get_json_uncoalesced(url, params, False, essential, accept)
 
     if not r.ok:
         try:
@@ -137,91 +244,438 @@ def get_json_safe(url, params=None):
         except Exception:
             body = r.text
         print(f"GitHub API Error {r.status_code} at {url}: {body}", file=sys.stderr)
-        return False, body
+        return False, body, r.headers
 
     try:
-        return True, r.json()
+        data = r.json()
     except ValueError:
         print(f"Response from {url} is not JSON.", file=sys.stderr)
-        return False, r.text
+        return False, r.text, r.headers
+    if cached:
+        http_cache.store(url, params, r.headers, data)
+    return True, data, r.headers
+
+
+def last_page_from_link(link_header):
+    """Reads the page number of rel="last" from a Link header. None if missing."""
+    for link in requests.utils.parse_header_links(link_header or ''):
+        if link.get('rel') == 'last':
+            page = parse_qs(urlparse(link.get('url', '')).query).get('page')
+            if page and page[0].isdigit():
+                return int(page[0])
+    return None
+
+
+# NEW: reusable paginator for every REST list endpoint
+def fetch_paginated(url, params=None, per_page=100, max_pages=None, cached=False, essential=True, shared=False):
+    """
+    Fetches all pages of a list endpoint. Returns a flat list in page order.
+
+    Page 1 is fetched alone; its Link rel="last" tells how many pages exist.
+    Pages 2..last are then fetched concurrently (CODEY_PAGE_WORKERS).
+    Without a Link header we fall back to the old one-after-another walk.
+
+    Error semantics are the same as the old loops: results stop at the first
+    failed, empty or short page — everything before it is kept.
+    essential=False / shared=True are passed on to every page (see get_json_with_headers).
+    """
+    params = dict(params or {}, per_page=per_page)
+
+    def page(n):
+        ok, data, hdrs = get_json_with_headers(url, {**params, 'page': n}, cached, essential, shared=shared)
+        return (ok and isinstance(data, list) and bool(data)), data, hdrs
+
+    ok, data, hdrs = page(1)
+    if not ok:
+        return []
+    results = list(data)
+    if len(data) < per_page or max_pages == 1:
+        return results
+
+    last = last_page_from_link(hdrs.get('Link'))
+    if max_pages:
+        last = min(last, max_pages) if last else max_pages
+
+    if last is None:
+        # No Link header → sequential walk, like before
+        n = 2
+        while True:
+            ok, data, _ = page(n)
+            if not ok:
+                break
+            results.extend(data)
+            if len(data) < per_page:
+                break
+            n += 1
+        return results
+
+    with ScopedThreadPool(max_workers=max(1, PAGE_WORKERS)) as pool:
+        pages = pool.map(page, range(2, last + 1))   # map keeps page order
+        for ok, data, _ in pages:
+            if not ok:
+                break
+            results.extend(data)
+            if len(data) < per_page:
+                break
+    return results
 
 
 
 # own stared 
 # new from >2.2.x
-def fetch_real_stars(owner):
+def fetch_real_stars(owner, repos_list=None):
     """
     Exact same logic as codey_star_report.py.
     Returns real star count (self-stars + fork stars removed).
     BUG (FIXED): returned set() — not JSON-serializable.
     Now returns int (count only). Themes and brutal_stats use 'self_starred_count'.
+
+    IMPROVED: no more walking the whole starred history. Stars are read newest
+    first and we stop at last run's newest star (see codey_starred.py).
+    repos_list (all repos of owner) enables the unstar / delete check.
     """
-    self_starred = set()
-    page = 1
-    while True:
-        ok, data = get_json_safe(
-            f'https://api.github.com/users/{owner}/starred',
-            params={'per_page': 100, 'page': page}
-        )
-        if not ok or not isinstance(data, list) or not data:
-            break
-        for repo in data:
-            if repo.get('owner', {}).get('login', '').lower() == owner.lower():
-                self_starred.add(repo.get('name'))
-        if len(data) < 100:
-            break
-        page += 1
+    def iter_pages():
+        page = 1
+        while True:
+            ok, data = get_json_safe(
+                f'{API_URL}/users/{owner}/starred',
+                params={'per_page': 100, 'page': page, 'sort': 'created', 'direction': 'desc'},
+                cached=(page == 1),
+                accept='application/vnd.github.star+json'
+            )
+            if not ok or not isinstance(data, list):
+                raise StarredFetchError(f"page {page}")
+            if not data:
+                return
+            yield [
+                (item.get('starred_at'),
+                 item.get('repo', {}).get('owner', {}).get('login', ''),
+                 item.get('repo', {}).get('name'))
+                for item in data
+            ]
+            if len(data) < 100:
+                return
+            page += 1
+
+    own_star_counts = None
+    if repos_list is not None:
+        own_star_counts = {r.get('name'): r.get('stargazers_count', 0) for r in repos_list}
 
     # BUG (FIXED): caller stored the set() directly in all_time_data['self_starred']
     # which then landed in brutal_stats → codey.json → JSON crash.
     # We return a plain int now. The set is only needed locally for star deduction.
-    return self_starred   # still a set — but get_all_data_for_user stores only len()
+    return sync_self_stars(owner, iter_pages, own_star_counts)   # still a set — only len() is stored
 
 # ─────────────────────────────────────────────
 # DATA FETCHERS
 # ─────────────────────────────────────────────
 
 def get_user_data(owner):
-    ok, data = get_json_safe(f'https://api.github.com/users/{owner}')
+    ok, data = get_json_safe(f'{API_URL}/users/{owner}', cached=True)
     return data if ok and isinstance(data, dict) else {}
 
 
-def get_repo_data(full_repo):
-    ok, data = get_json_safe(f'https://api.github.com/repos/{full_repo}')
-    return data if ok and isinstance(data, dict) else {}
+def fetch_all_repos_for_user(owner):
+    """Fetch ALL public repos with pagination. Sorted by last push.
+    IMPROVED: pages 2..n are fetched in parallel (see fetch_paginated).
+    IMPROVED: incremental — see sync_repos_for_user. Usually one request.
+    """
+    return sync_repos_for_user(owner)
 
 
-def fetch_all_repos_for_user(owner):
-    """Fetch ALL public repos with pagination. Sorted by last push."""
-    all_repos = []
-    page = 1
-    while True:
+def fetch_org_members(org):
+    """Public members of an org (logins)."""
+    members = fetch_paginated(f'{API_URL}/orgs/{org}/public_members', cached=True, shared=True)
+    return [m['login'] for m in members if m.get('login')]
+
+
+def fetch_org_repos(org):
+    """Public repos of an org — shared by all members in org mode."""
+    return fetch_paginated(f'{API_URL}/orgs/{org}/repos', params={'type': 'public', 'sort': 'pushed'},
+                           cached=True, shared=True)
+
+
+def fetch_all_repos_full(owner):
+    """Full listing, every page."""
+    return fetch_paginated(
+        f'{API_URL}/users/{owner}/repos',
+        params={'sort': 'pushed'},
+        cached=True
+    )
+
+
+def parse_ts(ts):
+    return datetime.fromisoformat(ts.replace('Z', '+00:00')) if ts else None
+
+
+def sync_repos_for_user(owner):
+    """
+    Incremental repo sync against .codey/repos/<owner>.json.
+
+    Pages are requested newest-updated first and we stop at the first repo that
+    was neither pushed nor updated since the last sync. updated_at also moves on
+    new stars / description edits, so star counts stay fresh too.
+    Deltas are merged into the index; every CODEY_REPO_FULL_SYNC_DAYS (or when
+    the index is missing) a full listing replaces it to catch deletions and renames.
+    """
+    path = REPO_INDEX_DIR / f"{owner.lower()}.json"
+    try:
+        index = json.loads(path.read_text(encoding='utf-8'))
+    except (FileNotFoundError, json.JSONDecodeError):
+        index = {}
+
+    now       = clock_now(timezone.utc)
+    last_sync = parse_ts(index.get('last_sync'))
+    last_full = parse_ts(index.get('last_full_sync'))
+    full      = (not index.get('repos') or not last_full
+                 or now - last_full >= timedelta(days=REPO_FULL_SYNC_DAYS))
+
+    if full:
+        repos_list = fetch_all_repos_full(owner)
+        if not repos_list and index.get('repos'):
+            # API down → keep the old index rather than pretending the user has 0 repos
+            return sorted(index['repos'].values(), key=lambda r: r.get('pushed_at') or '', reverse=True)
+        repos = {r['full_name']: r for r in repos_list}
+        index['last_full_sync'] = now.isoformat()
+        print(f"✓ Repos: full sync, {len(repos)} repos")
+    else:
+        repos   = index['repos']
+        since   = last_sync - timedelta(hours=1)    # safety margin for clock skew
+        changed = 0
+        page    = 1
+        while True:
+            ok, page_data = get_json_safe(
+                f'{API_URL}/users/{owner}/repos',
+                params={'per_page': 100, 'page': page, 'sort': 'updated'},
+                cached=True
+            )
+            if not ok or not isinstance(page_data, list):
+                now = last_sync     # don't move the watermark past a failed sync
+                break
+            if not page_data:
+                break
+            done = False
+            for repo in page_data:
+                newest = max(filter(None, [parse_ts(repo.get('pushed_at')), parse_ts(repo.get('updated_at'))]),
+                             default=None)
+                if newest and newest < since:
+                    done = True
+                    break
+                repos[repo['full_name']] = repo
+                changed += 1
+            if done or len(page_data) < 100:
+                break
+            page += 1
+        print(f"✓ Repos: incremental sync, {changed} changed, {len(repos)} in index ({page} page(s))")
+
+    index['repos']     = repos
+    index['last_sync'] = now.isoformat()
+    REPO_INDEX_DIR.mkdir(parents=True, exist_ok=True)
+    atomic_write_json(path, index, durable=False)
+
+    # Same order as before: most recently pushed first
+    return sorted(repos.values(), key=lambda r: r.get('pushed_at') or '', reverse=True)
+
+
+def event_id(event):
+    """GitHub event ids are increasing numeric strings."""
+    try:
+        return int(event.get('id', 0))
+    except (TypeError, ValueError):
+        return 0
+
+
+def load_event_log(owner):
+    """Local event log for owner: {'newest_id', 'newest_at', 'events': [...]}."""
+    try:
+        return json.loads((EVENT_LOG_DIR / f"{owner.lower()}.json").read_text(encoding='utf-8'))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {'newest_id': 0, 'newest_at': None, 'events': []}
+
+
+def save_event_log(owner, events, watermark=None):
+    """watermark = (newest_id, newest_at) to keep instead of events[0] — set after an incomplete walk."""
+    EVENT_LOG_DIR.mkdir(parents=True, exist_ok=True)
+    newest = events[0] if events else {}
+    newest_id, newest_at = watermark or (event_id(newest), newest.get('created_at'))
+    log = {
+        'newest_id': newest_id,
+        'newest_at': newest_at,
+        'events':    events,
+    }
+    atomic_write_json(EVENT_LOG_DIR / f"{owner.lower()}.json", log, durable=False)
+
+
+def fetch_all_events_for_user(owner):
+    """
+    Fetch up to 300 public events (GitHub max).
+
+    IMPROVED: incremental. per_page=100, newest first, and we stop as soon as a
+    page reaches the newest event of the last run (watermark). Everything older
+    comes from the local log in .codey/events/ — analyze_issue_activity still
+    sees the full window, usually for one request instead of ten.
+    """
+    log       = load_event_log(owner)
+    watermark = log.get('newest_id', 0)
+    cutoff    = clock_now(timezone.utc) - timedelta(days=90)
+
+    fresh    = []
+    complete = True
+    for page in range(1, EVENT_LOG_MAX // 100 + 1):
         ok, page_data = get_json_safe(
-            f'https://api.github.com/users/{owner}/repos',
-            params={'per_page': 100, 'page': page, 'sort': 'pushed'}
+            f'{API_URL}/users/{owner}/events/public',
+            params={'per_page': 100, 'page': page},
+            cached=(page == 1)      # 304 on page 1 = nothing new at all
         )
-        if not ok or not isinstance(page_data, list) or not page_data:
+        if not ok or not isinstance(page_data, list):
+            complete = False        # failed page — events between here and the watermark are missing
             break
-        all_repos.extend(page_data)
+        if not page_data:
+            break                   # end of the feed — see below
+        fresh.extend(e for e in page_data if event_id(e) > watermark)
+        if watermark and any(event_id(e) <= watermark for e in page_data):
+            break               # crossed the already-seen watermark
         if len(page_data) < 100:
             break
-        page += 1
-    return all_repos
 
+    # An empty, short or last page without the watermark means it aged out of
+    # GitHub's 300 events / 90 days — nothing is missing, so the watermark moves
+    # to the newest event (holding it would mean a full walk on every run).
+    # Only a failed page leaves a real gap.
+    merged = {event_id(e): e for e in log.get('events', [])}
+    merged.update((event_id(e), e) for e in fresh)
+    all_events = [
+        e for _, e in sorted(merged.items(), key=lambda kv: kv[0], reverse=True)
+        if not e.get('created_at')
+        or datetime.fromisoformat(e['created_at'].replace('Z', '+00:00')) >= cutoff
+    ][:EVENT_LOG_MAX]
+
+    if complete:
+        save_event_log(owner, all_events)
+    else:
+        # Like sync_repos_for_user: keep what we got, but don't move the
+        # watermark past the gap — the next run walks down to it again.
+        save_event_log(owner, all_events, (watermark, log.get('newest_at')))
+        print("⚠️  Event walk incomplete — watermark kept for the next run")
+    print(f"✓ Fetched {len(fresh)} new events ({len(all_events)} in log)")
+    return all_events
 
-def fetch_all_events_for_user(owner):
-    """Fetch up to 300 public events (GitHub max = 10 pages × 30)."""
-    all_events = []
-    for page in range(1, 11):
-        ok, page_data = get_json_safe(
-            f'https://api.github.com/users/{owner}/events/public',
-            params={'per_page': 30, 'page': page}
+
+# NEW: all own repos instead of own_repos[:5]
+def fetch_languages_for_repos(repos):
+    """
+    Returns Counter of language bytes over all given repos.
+
+    /languages is fetched concurrently (CODEY_LANG_WORKERS), and only for repos
+    whose pushed_at changed since the last run — everything else comes from
+    .codey/languages_cache.json. A failed fetch keeps the stale cached entry.
+    """
+    with _lang_cache_lock:
+        cache = load_lang_cache()
+
+    stale = [r for r in repos
+             if cache.get(r['full_name'], {}).get('pushed_at') != r.get('pushed_at')]
+    if stale and rate_limiter.is_low('core'):
+        # NEW: optional work — keep the rate limit for the calls that matter
+        print(f"⏭️  Rate limit low — {len(stale)} language refreshes skipped, using cache")
+        stale = []
+
+    def fetch(repo):
+        ok, lang_data = get_json_safe(f'{API_URL}/repos/{repo["full_name"]}/languages',
+                                      cached=True, essential=False)
+        return repo, (lang_data if ok and isinstance(lang_data, dict) else None)
+
+    fresh = {}
+    if stale:
+        with ScopedThreadPool(max_workers=max(1, LANG_WORKERS)) as pool:
+            for repo, lang_data in pool.map(fetch, stale):
+                if lang_data is not None:
+                    fresh[repo['full_name']] = {'pushed_at': repo.get('pushed_at'), 'languages': lang_data}
+    print(f"✓ Languages: {len(repos)} repos, {len(stale)} refreshed, {len(repos) - len(stale)} from cache")
+
+    # Re-read under the lock: other users of a batch run write the same file.
+    # Drop this owner's repos that no longer exist (deleted/renamed), keep everyone else's.
+    names  = {r['full_name'] for r in repos}
+    owners = {name.split('/')[0].lower() for name in names}
+    with _lang_cache_lock:
+        cache = load_lang_cache()
+        cache.update(fresh)
+        cache = {k: v for k, v in cache.items()
+                 if k in names or k.split('/')[0].lower() not in owners}
+        LANG_CACHE.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write_json(LANG_CACHE, cache, durable=False)
+
+    languages_bytes = Counter()
+    for name in names:
+        languages_bytes.update(cache.get(name, {}).get('languages', {}))
+    return languages_bytes
+
+
+def load_lang_cache():
+    try:
+        return json.loads(LANG_CACHE.read_text(encoding='utf-8'))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+# IMPROVED: was own_repos[:10] one by one — wasted calls on idle repos, missed repo #11
+def fetch_fallback_commits(owner, own_repos, since):
+    """
+    Direct /commits fallback for repos pushed after `since` only.
+    Queried concurrently (CODEY_FALLBACK_WORKERS) under a hard time budget
+    (CODEY_FALLBACK_BUDGET seconds) — whatever isn't back by then is dropped.
+    The budget is also a request deadline (codey_retry.request_deadline): calls
+    still running stop retrying and time out with it, nothing outlives the budget.
+    Returns [(repo, commits)] in pushed_at order, repos without commits left out.
+
+    NEW: org mode adds the org repos (SHARED_REPOS). Those are fetched once for
+    all members — no author filter, window start floored to the hour so every
+    member hits the same single-flight key — and filtered per member locally.
+    Without an author filter a busy org repo easily has more than 100 commits
+    in the window, so the shared query walks every page (fetch_paginated).
+    """
+    shared     = {r['full_name'] for r in SHARED_REPOS}
+    candidates = [r for r in own_repos + SHARED_REPOS
+                  if r.get('pushed_at') and parse_ts(r['pushed_at']) > since]
+    candidates.sort(key=lambda r: r['pushed_at'], reverse=True)
+    if not candidates:
+        print("  No repo pushed in the window — nothing to query.")
+        return []
+
+    since_iso    = since.isoformat()
+    shared_since = since.replace(minute=0, second=0, microsecond=0).isoformat()
+
+    def mine(commit):
+        date = parse_ts(((commit.get('commit') or {}).get('author') or {}).get('date'))
+        return ((commit.get('author') or {}).get('login', '').lower() == owner.lower()
+                and date is not None and date > since)
+
+    def fetch(repo):
+        if repo['full_name'] in shared:
+            commits_data = fetch_paginated(
+                f'{API_URL}/repos/{repo["full_name"]}/commits',
+                params={'since': shared_since},
+                essential=False,
+                shared=True     # same pages for every member, across their batch scopes
+            )
+            return [c for c in commits_data if mine(c)]
+        ok, commits_data = get_json_safe(
+            f'{API_URL}/repos/{repo["full_name"]}/commits',
+            params={'author': owner, 'since': since_iso, 'per_page': 100},
+            essential=False
         )
-        if not ok or not isinstance(page_data, list) or not page_data:
-            break
-        all_events.extend(page_data)
-    print(f"✓ Fetched {len(all_events)} events")
-    return all_events
+        return commits_data if ok and isinstance(commits_data, list) else []
+
+    pool = ScopedThreadPool(max_workers=max(1, FALLBACK_WORKERS))
+    with request_deadline(FALLBACK_BUDGET):     # copied into every worker at submit
+        futures = [pool.submit(fetch, r) for r in candidates]
+    done, pending = wait(futures, timeout=FALLBACK_BUDGET)
+    pool.shutdown(wait=False, cancel_futures=True)
+    if pending:
+        print(f"  ⏱️  Fallback budget ({FALLBACK_BUDGET:g}s) hit — {len(pending)} repo(s) dropped")
+
+    return [(repo, f.result()) for repo, f in zip(candidates, futures)
+            if f in done and f.result()]
 
 
 # ─────────────────────────────────────────────
@@ -438,7 +892,7 @@ def calculate_social_engineering_score(user_data, all_repos):
 def get_github_age_years(created_at_str):
     try:
         created = datetime.fromisoformat(created_at_str.replace('Z', '+00:00'))
-        return (datetime.now(timezone.utc) - created).days / 365.25
+        return (clock_now(timezone.utc) - created).days / 365.25
     except Exception:
         return 1
 
@@ -484,7 +938,7 @@ def calculate_skill_decay(last_update_str, current_stats):
 
     try:
         last_update   = datetime.fromisoformat(last_update_str.replace('Z', '+00:00'))
-        days_inactive = (datetime.now(timezone.utc) - last_update).days
+        days_inactive = (clock_now(timezone.utc) - last_update).days
 
         if days_inactive <= 1:
             return current_stats
@@ -505,24 +959,46 @@ def calculate_skill_decay(last_update_str, current_stats):
 # MAIN DATA COLLECTOR
 # ─────────────────────────────────────────────
 
-def get_all_data_for_user(owner):
+def collect_rest(owner):
+    """
+    REST collection stage: user, events, repos, self-stars, languages.
+    Returns the snapshot dict (written to .codey/snapshot/ — see codey_snapshot.py).
     """
-    Collects all relevant data for the owner:
+    user_data  = get_user_data(owner)
+    all_events = fetch_all_events_for_user(owner)
+    repos_list = fetch_all_repos_for_user(owner)
+
+    own_repos        = [r for r in repos_list if not r.get('fork')]
+    self_starred_set = fetch_real_stars(owner, repos_list)   # set — local only
+    languages_bytes  = fetch_languages_for_repos(own_repos)
+
+    return write_snapshot(owner, 'rest', user_data, repos_list, self_starred_set, all_events, languages_bytes)
+
+
+def get_all_data_for_user(owner, snapshot):
+    """
+    Collects all relevant data for the owner from a snapshot:
     - Events (commits, PRs, issues) from last 24h
     - Repo list with quality scores
-    - Language breakdown (first 5 own repos only, saves API calls)
+    - Language breakdown (all own repos, cached per repo by pushed_at)
     - Commit quality from message analysis
     - NEW: Issue quality from IssuesEvent analysis
 
     BUG (FIXED): self_starred was stored as set() → not JSON-serializable.
     Now stored as int (self_starred_count) in all_time_data.
-    The set is only used locally inside this function for star deduction.
+    The set is only used locally for star deduction.
     """
-    all_events = fetch_all_events_for_user(owner)
-    repos_list = fetch_all_repos_for_user(owner)
+    repos_list = snapshot['repos'] + snapshot['forks']
+    return build_all_time_data(owner, snapshot['events'], repos_list,
+                               set(snapshot['self_starred']), Counter(snapshot['languages']))
 
-    own_repos        = [r for r in repos_list if not r.get('fork')]
-    self_starred_set = fetch_real_stars(owner)          # set — local only
+
+def build_all_time_data(owner, all_events, repos_list, self_starred_set, languages_bytes):
+    """
+    Turns raw collector output into the all_time_data dict for update_brutal_stats.
+    Shared by both backends (REST + GraphQL) — same input shape, same result.
+    """
+    own_repos          = [r for r in repos_list if not r.get('fork')]
     self_starred_count = len(self_starred_set)          # int — safe for JSON
 
     total_stars = sum(
@@ -535,13 +1011,6 @@ def get_all_data_for_user(owner):
     repo_qualities   = [analyze_repo_quality(r) for r in own_repos]
     avg_repo_quality = sum(repo_qualities) / max(len(repo_qualities), 1)
 
-    # Language analysis — only first 5 own repos to save rate limit
-    languages_bytes = Counter()
-    for repo in own_repos[:5]:
-        ok, lang_data = get_json_safe(f'https://api.github.com/repos/{repo["full_name"]}/languages')
-        if ok and isinstance(lang_data, dict):
-            languages_bytes.update(lang_data)
-
     dominant_language = languages_bytes.most_common(1)
     dominant_language = dominant_language[0][0] if dominant_language else 'unknown'
 
@@ -554,7 +1023,7 @@ def get_all_data_for_user(owner):
         language_diversity_penalty = 1.0
 
     # Process events for daily activity (last 24h)
-    now          = datetime.now(timezone.utc)
+    now          = clock_now(timezone.utc)
     one_day_ago  = now - timedelta(days=1)
     daily_commits = 0
     daily_prs     = 0
@@ -587,18 +1056,14 @@ def get_all_data_for_user(owner):
     if daily_commits == 0 and own_repos:
         if not ENABLE_FALLBACK:
             print("⏭️  Events API returned 0 commits — fallback disabled (set CODEY_FALLBACK=true to enable)")
+        elif rate_limiter.is_low('core'):
+            print("⏭️  Events API returned 0 commits — fallback skipped, rate limit low")
         else:
             print("⚠️  Events API returned 0 commits — trying direct /commits fallback...")
-            since_iso = (datetime.now(timezone.utc) - timedelta(days=1)).isoformat()
-            for repo in own_repos[:10]:
-                ok, commits_data = get_json_safe(
-                    f'https://api.github.com/repos/{repo["full_name"]}/commits',
-                    params={'author': owner, 'since': since_iso, 'per_page': 100}
-                )
-                if ok and isinstance(commits_data, list) and commits_data:
-                    daily_commits += len(commits_data)
-                    all_commits.extend(commits_data)
-                    print(f"  ✓ {repo['full_name']}: {len(commits_data)} commits")
+            for repo, commits_data in fetch_fallback_commits(owner, own_repos, one_day_ago):
+                daily_commits += len(commits_data)
+                all_commits.extend(commits_data)
+                print(f"  ✓ {repo['full_name']}: {len(commits_data)} commits")
             print(f"  Fallback total: {daily_commits} commits")
 
     commit_quality_data = analyze_commit_quality(all_commits) if all_commits else {
@@ -624,30 +1089,213 @@ def get_all_data_for_user(owner):
     }
 
 
+# ─────────────────────────────────────────────
+# GRAPHQL BULK COLLECTOR (NEW)
+# ─────────────────────────────────────────────
+# One paginated query instead of the REST fan-out (user + repos + starred +
+# N×/languages). Events stay REST — GraphQL has no public event feed.
+# Select with CODEY_BACKEND=graphql or BACKEND = "graphql" in codey.config.
+
+BULK_QUERY = """
+query($login: String!, $reposAfter: String, $starsAfter: String,
+      $withRepos: Boolean!, $withStars: Boolean!) {
+  user(login: $login) {
+    login name createdAt
+    followers { totalCount }
+    following { totalCount }
+    repositories(first: 100, after: $reposAfter, privacy: PUBLIC,
+                 ownerAffiliations: OWNER,
+                 orderBy: {field: PUSHED_AT, direction: DESC}) @include(if: $withRepos) {
+      totalCount
+      nodes {
+        name nameWithOwner description isFork isArchived
+        stargazerCount forkCount pushedAt updatedAt createdAt url
+        owner { login }
+        licenseInfo { key name spdxId }
+        primaryLanguage { name }
+        issues(states: OPEN) { totalCount }
+        pullRequests(states: OPEN) { totalCount }
+        languages(first: 100) { edges { size node { name } } }
+      }
+      pageInfo { hasNextPage endCursor }
+    }
+    starredRepositories(first: 100, after: $starsAfter) @include(if: $withStars) {
+      nodes { name owner { login } }
+      pageInfo { hasNextPage endCursor }
+    }
+  }
+}
+"""
+
+
+def post_graphql(query, variables=None):
+    """POST a GraphQL query. Returns (ok: bool, data). Identical queries are coalesced."""
+    return singleflight.do(
+        request_key('POST', GRAPHQL_URL, body={'query': query, 'variables': variables or {}}),
+        lambda: _post_graphql_uncoalesced(query, variables),
+        keep=lambda result: result[0]
+    )
+
+
+def _post_graphql_uncoalesced(query, variables):
+    if not rate_limiter.before_request('graphql'):
+        return False, None
+
+    def send_with(auth):
+        count_request('graphql')
+        return get_session().post(GRAPHQL_URL, json={'query': query, 'variables': variables or {}},
+                                  headers={**headers, **auth}, timeout=request_timeout(HTTP_TIMEOUT))
+
+    def send():
+        return pooled_request(send_with, 'graphql')
+
+    try:
+        r, err = request_with_retry(send, endpoint_key('POST', GRAPHQL_URL))
+    except Exception as e:
+        r, err = None, e
+    if r is None:
+        print(f"Network-Error at {GRAPHQL_URL}: {err}", file=sys.stderr)
+        return False, None
+    try:
+        body = r.json()
+    except ValueError:
+        print(f"GraphQL response is not JSON ({r.status_code}).", file=sys.stderr)
+        return False, r.text
+    if not r.ok or body.get('errors'):
+        print(f"GraphQL Error {r.status_code}: {body.get('errors') or body}", file=sys.stderr)
+        return False, body
+    return True, body.get('data', {})
+
+
+def graphql_repo_to_rest(node):
+    """Maps a GraphQL repository node onto the REST fields Codey reads."""
+    lic = node.get('licenseInfo')
+    return {
+        'name':              node['name'],
+        'full_name':         node['nameWithOwner'],
+        'owner':             {'login': node['owner']['login']},
+        'description':       node.get('description'),
+        'fork':              node.get('isFork', False),
+        'archived':          node.get('isArchived', False),
+        'stargazers_count':  node.get('stargazerCount', 0),
+        'forks_count':       node.get('forkCount', 0),
+        # REST open_issues_count = open issues + open PRs
+        'open_issues_count': node['issues']['totalCount'] + node['pullRequests']['totalCount'],
+        'license':           {'key': lic['key'], 'name': lic['name'], 'spdx_id': lic['spdxId']} if lic else None,
+        'language':          (node.get('primaryLanguage') or {}).get('name'),
+        'pushed_at':         node.get('pushedAt'),
+        'updated_at':        node.get('updatedAt'),
+        'created_at':        node.get('createdAt'),
+        'html_url':          node.get('url'),
+    }
+
+
+def fetch_bulk_graphql(owner):
+    """
+    Pages through repositories + starredRepositories in the same queries.
+    Returns (user_data, repos_list, self_starred_set, languages_bytes) or None on error.
+    """
+    variables = {'login': owner, 'reposAfter': None, 'starsAfter': None,
+                 'withRepos': True, 'withStars': True}
+    user_data        = None
+    repos_list       = []
+    repo_languages   = {}
+    self_starred_set = set()
+
+    while variables['withRepos'] or variables['withStars']:
+        ok, data = post_graphql(BULK_QUERY, variables)
+        if not ok or not data.get('user'):
+            return None
+        user = data['user']
+
+        if user_data is None:
+            user_data = {
+                'login':        user['login'],
+                'name':         user.get('name'),
+                'created_at':   user.get('createdAt'),
+                'followers':    user['followers']['totalCount'],
+                'following':    user['following']['totalCount'],
+                'public_repos': user['repositories']['totalCount'],
+            }
+
+        if variables['withRepos']:
+            page = user['repositories']
+            for node in page['nodes']:
+                repos_list.append(graphql_repo_to_rest(node))
+                repo_languages[node['nameWithOwner']] = {
+                    e['node']['name']: e['size'] for e in node['languages']['edges']
+                }
+            variables['withRepos']  = page['pageInfo']['hasNextPage']
+            variables['reposAfter'] = page['pageInfo']['endCursor']
+
+        if variables['withStars']:
+            page = user['starredRepositories']
+            for node in page['nodes']:
+                if node['owner']['login'].lower() == owner.lower():
+                    self_starred_set.add(node['name'])
+            variables['withStars'] = page['pageInfo']['hasNextPage']
+            variables['starsAfter'] = page['pageInfo']['endCursor']
+
+    languages_bytes = Counter()
+    for repo in repos_list:
+        if not repo['fork']:
+            languages_bytes.update(repo_languages.get(repo['full_name'], {}))
+
+    print(f"✓ GraphQL: {len(repos_list)} repos, {len(self_starred_set)} self-stars")
+    return user_data, repos_list, self_starred_set, languages_bytes
+
+
+def collect_graphql(owner):
+    """
+    GraphQL collection stage. Same snapshot as collect_rest.
+    Returns None so the caller can fall back to REST.
+    """
+    bulk = fetch_bulk_graphql(owner)
+    if bulk is None:
+        return None
+    user_data, repos_list, self_starred_set, languages_bytes = bulk
+    all_events = fetch_all_events_for_user(owner)
+    return write_snapshot(owner, 'graphql', user_data, repos_list, self_starred_set, all_events, languages_bytes)
+
+
+def collect_snapshot(owner, backend='rest'):
+    """Runs the collection stage with the configured backend (GraphQL falls back to REST)."""
+    if backend == 'graphql':
+        if TOKEN:
+            print("🧬 Collector backend: GraphQL")
+            snapshot = collect_graphql(owner)
+            if snapshot is not None:
+                return snapshot
+            print("⚠️  GraphQL collector failed — falling back to REST.")
+        else:
+            print("⚠️  GraphQL needs a token — using REST.")
+    return collect_rest(owner)
+
+
 # ─────────────────────────────────────────────
 # CODEY STATE
 # ─────────────────────────────────────────────
 
-def load_codey():
-    """Load state from codey.json, migrate missing fields gracefully."""
+def load_codey(path='codey.json', owner=None):
+    """Load state from codey.json (or path), migrate missing fields gracefully.
+    NEW: goes through the state store — CODEY_STATE_BACKEND=sqlite reads the database (codey_state.py).
+    """
     defaults = {
         'health': 50, 'hunger': 50, 'happiness': 50, 'energy': 50,
         'level': 1, 'streak': 0, 'total_commits': 0, 'mood': 'neutral',
         'rpg_stats': {}, 'achievements': [], 'history': [],
         'brutal_stats': {}, 'last_update': None
     }
-    try:
-        with open('codey.json', 'r') as f:
-            data = json.load(f)
-        # Migrate: add missing keys without losing existing data
-        for k, v in defaults.items():
-            if k not in data:
-                data[k] = v
-        print("codey.json loaded.")
-        return data
-    except (FileNotFoundError, json.JSONDecodeError):
-        print("codey.json not found or invalid — creating defaults.")
+    data = state_store.load(owner or OWNER, path)
+    if data is None:
+        print(f"{path} not found or invalid — creating defaults.")
         return defaults
+    # Migrate: add missing keys without losing existing data
+    for k, v in defaults.items():
+        if k not in data:
+            data[k] = v
+    print(f"{path} loaded.")
+    return data
 
 
 def check_brutal_achievements(codey, tier, github_years):
@@ -702,7 +1350,7 @@ def calculate_prestige_requirements(codey, github_years):
 # CORE UPDATE
 # ─────────────────────────────────────────────
 
-def update_brutal_stats(codey, daily_activity, all_time_data, user_data):
+def update_brutal_stats(codey, daily_activity, all_time_data, user_data, owner=None):
     """
     Main stat update. Call order matters:
     1. Decay inactive stats
@@ -716,7 +1364,7 @@ def update_brutal_stats(codey, daily_activity, all_time_data, user_data):
     BUG (FIXED): Weekend bonus was applied to daily_activity BEFORE this function,
     which inflated total_commits permanently. Now total_commits uses raw_commits.
     """
-    now = datetime.now(timezone.utc).isoformat()
+    now = clock_now(timezone.utc).isoformat()
 
     github_years    = get_github_age_years(user_data.get('created_at', ''))
     tier            = determine_tier(github_years)
@@ -728,8 +1376,9 @@ def update_brutal_stats(codey, daily_activity, all_time_data, user_data):
     if codey.get('last_update'):
         codey = calculate_skill_decay(codey['last_update'], codey)
 
-    # History (keep last 30 days)
-    codey['history'] = codey.get('history', [])[-29:] + [{
+    # History: NEW append-only log with daily / weekly / monthly tiers (codey_history.py),
+    # codey.json only keeps the recent window
+    codey['history'] = record_history(owner or OWNER, {
         'timestamp':     now,
         'daily_commits': daily_activity['commits'],
         'daily_prs':     daily_activity['prs'],
@@ -737,7 +1386,7 @@ def update_brutal_stats(codey, daily_activity, all_time_data, user_data):
         'mood':          codey['mood'],
         'streak':        codey['streak'],
         'tier':          tier,
-    }]
+    }, codey.get('history', []))
 
     # Step 2: XP calculation
     commit_quality = all_time_data.get('commit_quality', {})
@@ -851,11 +1500,11 @@ def get_seasonal_bonus():
         8:  {'emoji': '🧊', 'name': 'Freeze',        'multiplier': 1.05},
         9:  {'emoji': '🎓', 'name': 'School',        'multiplier': 1.2},
     }
-    return bonuses.get(datetime.now().month)
+    return bonuses.get(clock_now().month)
 
 
 def is_weekend_warrior():
-    return datetime.now().weekday() >= 5
+    return clock_now().weekday() >= 5
 
 
 # ─────────────────────────────────────────────
@@ -889,6 +1538,21 @@ def load_theme_config(config_path: str = "codey.config") -> tuple:
     print(f"⚙️  Animation power: {power} ({cycles} cycles)")
     return theme, cycles
 
+def load_backend_config(config_path: str = "codey.config") -> str:
+    """Reads BACKEND= from codey.config ("rest" or "graphql").
+    Env var CODEY_BACKEND always wins over config.
+    """
+    backend = "rest"
+    try:
+        for line in Path(config_path).read_text().splitlines():
+            line = line.strip()
+            if line.startswith("BACKEND"):
+                backend = line.split("=")[1].split("#")[0].strip().strip('"').strip("'")
+    except FileNotFoundError:
+        pass
+    backend = os.environ.get('CODEY_BACKEND', backend).lower()
+    return backend if backend in ('rest', 'graphql') else 'rest'
+
 def load_generate_fn(theme: str):
     """Loads generate_brutal_svg from theme folder. Fallback to default."""
     candidates = [
@@ -908,21 +1572,34 @@ def load_generate_fn(theme: str):
 
 
 # ─────────────────────────────────────────────
-# MAIN RUN
+# ONE USER RUN
 # ─────────────────────────────────────────────
-if __name__ == "__main__":
+
+def run_codey_update(owner, state_path='codey.json', svg_path='codey.svg'):
+    """
+    One full Codey run for owner: guard → snapshot/collect → stats → state + SVG.
+    Returns the backend used ('rest' / 'graphql') or 'skipped' (guard).
+    NEW: a function so batch mode (codey_batch.py) can run it per user.
+    """
     print("🔥 Updating BRUTAL Codey...")
 
     # ── GUARD FIRST — skip all API calls if not due ──
-    codey = load_codey()
+    codey = load_codey(state_path, owner)
     should_update, hours_since = should_run_full_update(codey)
 
     if not should_update:
         print(f"⏭️ Last update was {hours_since:.1f}h ago — skipping all API calls.")
     else:
         # ── API calls only when needed ────────────────
-        user_data     = get_user_data(OWNER)
-        all_time_data = get_all_data_for_user(OWNER)
+        # NEW: collect once into .codey/snapshot/ — reused by the star-report scripts.
+        # Not the other way round: yesterday's snapshot scored against today's
+        # 24h window would report old activity as new.
+        snapshot = load_snapshot(owner, max_age_hours=SCORE_SNAPSHOT_MINUTES / 60) if SCORE_SNAPSHOT_MINUTES > 0 else None
+        if snapshot is None:
+            snapshot = collect_snapshot(owner, load_backend_config())
+        backend       = snapshot['backend']
+        user_data     = snapshot['user']
+        all_time_data = get_all_data_for_user(owner, snapshot)
 
         raw_commits = all_time_data.get('daily_commits', 0)
         raw_prs     = all_time_data.get('daily_prs', 0)
@@ -949,10 +1626,9 @@ if __name__ == "__main__":
         print(f"Issue Score:    {issue_data.get('score', 1.0):.2f} "
               f"(closed: {issue_data.get('closed', 0)}, ratio: {issue_data.get('close_ratio', 0):.2f})")
 
-        codey = update_brutal_stats(codey, daily_activity, all_time_data, user_data)
-        with open('codey.json', 'w') as f:
-            json.dump(codey, f, indent=2)
-        print("\n💾 codey.json written.")
+        codey = update_brutal_stats(codey, daily_activity, all_time_data, user_data, owner)
+        state_store.save(owner, codey, state_path)
+        print(f"\n💾 {state_path} written.")
         brutal = codey.get('brutal_stats', {})
         print(f"\n🔥 BRUTAL UPDATE COMPLETE:")
         print(f"  Tier:         {brutal.get('tier', '?').upper()} ({brutal.get('github_years', 0):.1f} years)")
@@ -973,7 +1649,99 @@ if __name__ == "__main__":
     theme, cycles = load_theme_config()
     generate_fn   = load_generate_fn(theme)
     svg           = generate_fn(codey, seasonal_bonus, cycles)
-    with open('codey.svg', 'w', encoding='utf-8') as f:
-        f.write(svg)
-    print("🎨 codey.svg written.")
+    atomic_write(svg_path, svg, backup=True)   # NEW: temp + fsync + rename, last good SVG kept
+    print(f"🎨 {svg_path} written.")
+
+    return backend if should_update else 'skipped'
+
+
+def probe_rate_limit():
+    """GET /rate_limit (free) once per token — fills the token pool and the rate limiter's budget."""
+    def get(auth):
+        count_request('rest')
+        return get_session().get(f'{API_URL}/rate_limit', headers={**headers, **auth}, timeout=HTTP_TIMEOUT)
+    return token_pool.probe(get)
+
+
+def run_fleet(owners, out_dir=BATCH_OUT):
+    """
+    Batch / org run through the fleet scheduler (codey_fleet.py):
+    most stale users first, only as many as the rate-limit budget allows,
+    optionally sharded across runners (codey_shard.py).
+    Returns summary rows — users over budget as result 'deferred'.
+    """
+    probe_rate_limit()
+    budget = available_budget()
+    leases = lease_store()   # NEW: CODEY_LEASE_DIR → runners share one queue (codey_shard.py)
+
+    # With leases the budget is spent per claimed user, not planned up front:
+    # runners on the same queue would otherwise all plan for the same users.
+    plan = plan_fleet(owners, out_dir, should_run_full_update,
+                      None if leases else budget, accept=shard_filter())
+    print_plan(plan)
+    if leases:
+        def run_and_flush(owner, state_path, svg_path):
+            result = run_codey_update(owner, state_path, svg_path)
+            state_store.flush()   # other runners re-check the state before they run this user
+            return result
+
+        costs    = load_costs(out_dir)
+        run_user = leased(run_and_flush, leases, should_run_full_update, read_state,
+                          budget, lambda owner: expected_cost(costs, owner))
+        with leases:
+            rows = run_batch(plan['run'], run_user, out_dir=out_dir)
+        leases.print_summary()
+    else:
+        rows = run_batch(plan['run'], run_codey_update, out_dir=out_dir)
+    state_store.flush()
+    save_costs(out_dir, rows)
+    rows += [{'owner': owner, 'result': 'deferred', 'error': None, 'seconds': 0.0, 'calls': {}}
+             for owner in plan['deferred']]
+    write_summary(rows, out_dir)
+    return rows
+
+
+# ─────────────────────────────────────────────
+# MAIN RUN
+# ─────────────────────────────────────────────
+if __name__ == "__main__":
+    def print_run_summary(label):
+        http_cache.save()
+        http_cache.print_summary()
+        print_request_summary(label)
+        rate_limiter.print_summary()
+        token_pool.print_summary()
+        retry_stats.print_summary()
+        singleflight.print_summary()
+        state_store.flush()
+        state_store.print_summary()
+
+    if COLLECT_ONLY:
+        print("📦 Collecting snapshot only...")
+        collect_snapshot(OWNER, load_backend_config())
+        print_run_summary("collect only")
+        sys.exit(0)
+
+    if BATCH_MANIFEST:
+        rows = run_fleet(load_manifest(BATCH_MANIFEST))
+        print_run_summary(f"batch: {len(rows)} users")
+        print_batch_summary(rows)
+        sys.exit(0)
+
+    if ORG_NAME:
+        members = fetch_org_members(ORG_NAME)
+        if not members:
+            print(f"⛔ No public members found for org '{ORG_NAME}'.")
+            sys.exit(1)
+        SHARED_REPOS[:] = fetch_org_repos(ORG_NAME)
+        print(f"🏢 Org {ORG_NAME}: {len(members)} public members, {len(SHARED_REPOS)} shared repos")
+        out_dir = BATCH_OUT / ORG_NAME.lower()
+        rows    = run_fleet(members, out_dir)
+        print_run_summary(f"org {ORG_NAME}: {len(rows)} members")
+        print_batch_summary(rows)
+        print_org_summary(org_aggregate(ORG_NAME, rows, out_dir))
+        sys.exit(0)
+
+    backend = run_codey_update(OWNER)
+    print_run_summary(f"backend: {backend}" if backend != 'skipped' else "skipped")
     print("\n💀 BRUTAL Codey update finished. Only the strong survive! 💀")